@@ -25,6 +25,10 @@ MOTOR_PINS = {
     7: {'forward': 26, 'reverse': 16},  # Pin 37, Pin 36
 }
 
+# The same pins as flat tuples indexed by slot - 1, for lookups on the dispense path
+FORWARD_PIN = tuple(MOTOR_PINS[slot]['forward'] for slot in sorted(MOTOR_PINS))
+REVERSE_PIN = tuple(MOTOR_PINS[slot]['reverse'] for slot in sorted(MOTOR_PINS))
+
 # Printer configuration
 PRINTER_PORT = '/dev/usb/lp0'  # Adjust based on actual port
 PRINTER_BAUDRATE = 9600
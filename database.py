@@ -1,7 +1,8 @@
 import json
 import os
 from datetime import datetime
-from config import MEDICINES_FILE, USERS_FILE, QUESTIONNAIRE_FILE, LOG_FILE
+from config import MEDICINES_FILE, USERS_FILE, QUESTIONNAIRE_FILE
+import log_writer
 
 def load_json(file_path):
     """Load data from JSON file with error handling."""
@@ -30,13 +31,40 @@ def save_json(file_path, data):
     with open(file_path, 'w') as f:
         json.dump(data, f, indent=4)
 
+# Parsed JSON files keyed by path, stored as (mtime, data); a file is re-parsed only when it changes
+_cache = {}
+
+def _load_cached(file_path):
+    """load_json() through the mtime cache."""
+    try:
+        mtime = os.stat(file_path).st_mtime
+    except OSError:
+        mtime = None
+    cached = _cache.get(file_path)
+    if cached is not None and mtime is not None and cached[0] == mtime:
+        return cached[1]
+    data = load_json(file_path)
+    if mtime is not None:
+        _cache[file_path] = (mtime, data)
+    return data
+
+def _save_cached(file_path, data):
+    """save_json() and keep the mtime cache in step with what was written."""
+    try:
+        save_json(file_path, data)
+    except Exception:
+        # Don't keep a copy the file never received
+        _cache.pop(file_path, None)
+        raise
+    _cache[file_path] = (os.stat(file_path).st_mtime, data)
+
 def load_medicines():
-    """Load medicines data."""
-    return load_json(MEDICINES_FILE)
+    """Load medicines data, re-reading the file only when it has changed."""
+    return _load_cached(MEDICINES_FILE)
 
 def save_medicines(medicines):
     """Save medicines data."""
-    save_json(MEDICINES_FILE, medicines)
+    _save_cached(MEDICINES_FILE, medicines)
 
 def load_users():
     """Load users data."""
@@ -44,20 +72,21 @@ def load_users():
 
 def save_users(users):
     """Save users data."""
-    save_json(USERS_FILE, users)
+    _save_cached(USERS_FILE, users)
 
 def load_questionnaire():
-    """Load questionnaire data."""
-    return load_json(QUESTIONNAIRE_FILE)
+    """Load questionnaire data, re-reading the file only when it has changed."""
+    return _load_cached(QUESTIONNAIRE_FILE)
 
 def save_questionnaire(questionnaire):
     """Save questionnaire data."""
-    save_json(QUESTIONNAIRE_FILE, questionnaire)
+    _save_cached(QUESTIONNAIRE_FILE, questionnaire)
 
 def get_user_by_id(user_id):
-    """Get user details by ID."""
-    users = load_users()
-    return users.get(str(user_id))
+    """Get user details by ID; users.json is re-read only when it has changed."""
+    user = _load_cached(USERS_FILE).get(str(user_id))
+    # A copy, so callers can't change the cached file contents
+    return dict(user) if user is not None else None
 
 def get_medicine_by_slot(slot_id):
     """Get medicine details by slot ID."""
@@ -68,7 +97,6 @@ def get_medicine_by_slot(slot_id):
     return None
 
 def log_transaction(user_id, medicine_name, slot_id):
-    """Log a transaction."""
+    """Log a transaction. The line is written in the background by log_writer."""
     timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    with open(LOG_FILE, 'a') as f:
-        f.write(f"{timestamp}: User {user_id} dispensed {medicine_name} from slot {slot_id}\n")
\ No newline at end of file
+    log_writer.write_line(f"{timestamp}: User {user_id} dispensed {medicine_name} from slot {slot_id}\n")
\ No newline at end of file
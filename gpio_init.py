@@ -0,0 +1,83 @@
+import atexit
+from config import MOTOR_PINS, FORWARD_PIN, REVERSE_PIN
+
+# Prefer lgpio (current Pi OS, and the only option on a Pi 5); fall back to RPi.GPIO elsewhere
+try:
+    import lgpio  # type: ignore
+except ImportError:
+    lgpio = None
+    import RPi.GPIO as GPIO
+
+# gpiochip that carries the header pins
+GPIO_CHIP = 0
+
+HIGH = 1
+LOW = 0
+
+# True once the motor pins have been set up in this process
+initialized = False
+
+# lgpio chip handle while the pins are claimed
+_chip = None
+
+def ensure():
+    """Configure every motor pin as a LOW output, once per process."""
+    global initialized, _chip
+    if initialized:
+        return
+
+    if lgpio is not None:
+        _chip = lgpio.gpiochip_open(GPIO_CHIP)
+        try:
+            for slot, pins in MOTOR_PINS.items():
+                lgpio.gpio_claim_output(_chip, pins['forward'], LOW)
+                lgpio.gpio_claim_output(_chip, pins['reverse'], LOW)
+        except Exception:
+            # Closing the chip frees the pins claimed so far, so the next ensure() can claim them again
+            lgpio.gpiochip_close(_chip)
+            _chip = None
+            raise
+    else:
+        # Set GPIO mode and disable warnings
+        GPIO.setmode(GPIO.BCM)
+        GPIO.setwarnings(False)
+
+        # Setup motor pins as outputs, all in one call
+        GPIO.setup(list(FORWARD_PIN + REVERSE_PIN), GPIO.OUT, initial=GPIO.LOW)
+
+    initialized = True
+
+def write(pin, level):
+    """Drive one BCM pin HIGH or LOW."""
+    if _chip is not None:
+        lgpio.gpio_write(_chip, pin, level)
+    else:
+        GPIO.output(pin, level)
+
+def write_many(pins, level):
+    """Drive several BCM pins to the same level."""
+    if _chip is not None:
+        for pin in pins:
+            lgpio.gpio_write(_chip, pin, level)
+    else:
+        GPIO.output(list(pins), [level] * len(pins))
+
+def cleanup():
+    """Release the GPIO pins; the next ensure() sets them up again."""
+    global initialized, _chip
+    if not initialized:
+        return
+    if _chip is not None:
+        # Lines keep their last level after release, so make sure every motor is off first
+        for slot, pins in MOTOR_PINS.items():
+            lgpio.gpio_write(_chip, pins['forward'], LOW)
+            lgpio.gpio_write(_chip, pins['reverse'], LOW)
+        lgpio.gpiochip_close(_chip)
+        _chip = None
+    else:
+        GPIO.cleanup()
+    initialized = False
+
+
+# Release the pins on exit; registered here only, so it runs once however many modules use the pins
+atexit.register(cleanup)
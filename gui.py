@@ -1,9 +1,12 @@
 import os
-import csv
+import time
+import queue
+import functools
+import threading
 import tkinter as tk
+import tkinter.font as tkfont
 from datetime import datetime
 from typing import Optional
-from PIL import Image, ImageTk
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 
@@ -15,97 +18,71 @@ DANGER = "#dc3545"
 LIGHT = "#f8f9fa"
 DARK = "#343a40"
 
-from config import SCREEN_WIDTH, SCREEN_HEIGHT, PRINTER_PORT, PRINTER_BAUDRATE
+from config import (
+    SCREEN_WIDTH,
+    SCREEN_HEIGHT,
+)
 from database import (
     load_medicines,
+    save_medicines,
     load_questionnaire,
     log_transaction,
     get_user_by_id,
 )
 from motor_control import dispense
+from printer import print_receipt
 
 
-# Existing printer module prints a basic receipt; we provide a local version that also includes amount
-# without changing other files.
-
-def print_order_receipt(user_id: str, user_name: str, medicine_name: str, slot_id: int, amount: float) -> None:
-    init_printer = b"\x1b\x40"  # Initialize printer
-    feed_lines = b"\x1b\x64\x04"  # Print and feed n lines (n=4)
-    cut_paper = b"\x1d\x56\x42\x00"  # Cut paper
-
-    receipt_text = f"""
-Medicine Vending Machine Receipt
-
-User ID: {user_id}
-Name: {user_name}
-Medicine: {medicine_name}
-Amount: ₹{amount:.2f}
-Date/Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-
-Thank you for your payment!
-"""
-
-    # Prefer direct USB printer device if available (/dev/usb/lp0), else fallback to serial
-    target_path = PRINTER_PORT
-    try:
-        if os.path.exists(target_path) and target_path.startswith("/dev/usb/lp"):
-            with open(target_path, "wb", buffering=0) as f:
-                f.write(init_printer)
-                f.write(receipt_text.replace("\r\n", "\n").encode("utf-8"))
-                f.write(b"\n\n")
-                f.write(feed_lines)
-                f.write(cut_paper)
-            print("Receipt printed successfully (usblp).")
-            return
-        # Serial fallback
-        import serial  # Imported here to avoid dependency issues on non-RPi dev machines
-        with serial.Serial(PRINTER_PORT, PRINTER_BAUDRATE, timeout=1, write_timeout=2) as ser:
-            ser.write(init_printer)
-            ser.write(receipt_text.replace("\r\n", "\n").encode("utf-8"))
-            ser.write(b"\n\n")
-            ser.write(feed_lines)
-            ser.flush()
-            try:
-                import time as _t
-                _t.sleep(0.2)
-            except Exception:
-                pass
-            ser.write(cut_paper)
-            ser.flush()
-        print("Receipt printed successfully (serial).")
-    except Exception as e:  # pragma: no cover
-        print(f"Printer error: {e}")
+# Payment QR image, resolved once at import: the pre-sized PNG from tools/prepare_qr.py, else the original JPEG
+_QR_IMAGES_DIR = os.path.join(os.path.dirname(__file__), "assets", "images")
+_QR_PATH = next(
+    (p for p in (os.path.join(_QR_IMAGES_DIR, "qr_display.png"), os.path.join(_QR_IMAGES_DIR, "qr.jpeg")) if os.path.exists(p)),
+    None,
+)
+_QR_AVAILABLE = _QR_PATH is not None
+
+
+# payments.csv rows are written by hand; keep separators and quotes out of free-text fields
+_PAYMENTS_CSV_HEADER = "id,medicine,amount,date,time\r\n"
+_CSV_FIELD_TABLE = str.maketrans({",": " ", '"': "'", "\r": " ", "\n": " "})
 
 
 def ensure_dir(path: str) -> None:
     os.makedirs(path, exist_ok=True)
 
 
-def generate_qr_image(data: str, out_path: str, size: int = 240) -> str:
-    """Generate a QR code image for payment. Tries to use qrcode; falls back to a placeholder image."""
-    # Try to use qrcode if available
-    try:
-        import qrcode  # type: ignore
+def debounce(interval: float = 0.3):
+    """Ignore repeat calls to a touch callback that arrive within `interval` seconds.
 
-        img = qrcode.make(data)
-        img = img.resize((size, size))
-        img.save(out_path)
-        return out_path
-    except Exception:
-        # Fallback: draw a placeholder image
-        img = Image.new("RGB", (size, size), color=(255, 255, 255))
-        draw = ImageDraw.Draw(img)
-        draw.rectangle([4, 4, size - 4, size - 4], outline=(0, 0, 0), width=4)
-        draw.text((10, size // 2 - 10), "Scan to Pay", fill=(0, 0, 0))
-        img.save(out_path)
-        return out_path
+    The window is measured from when the previous call finished, so taps queued
+    while a slow handler (e.g. dispensing) was running are dropped too.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            last = self._last_tap.get(func.__name__)
+            if last is not None and time.monotonic() - last < interval:
+                return None
+            self._last_tap[func.__name__] = time.monotonic()
+            try:
+                return func(self, *args, **kwargs)
+            finally:
+                self._last_tap[func.__name__] = time.monotonic()
+        return wrapper
+    return decorator
 
 
 class VendingGUI(ttk.Window):
+    # Payment QR image shared across payments, built once from _QR_PATH
+    _qr_photo_cache = None
+
     def __init__(self):
         super().__init__(themename="flatly")
         self.title("Medicine Vending Machine")
         
+        # Named fonts shared by every widget, see _font()
+        self._fonts = {}
+        
         # Reduce screen updates
         self.update_idletasks()
         self.update()
@@ -115,7 +92,7 @@ class VendingGUI(ttk.Window):
         self.update()
         
         # Set default font and styling
-        default_font = ('Arial', 18)  # Increased font size
+        default_font = self._font(18)  # Increased font size
         self.option_add('*TButton*Font', default_font)
         self.option_add('*TLabel*Font', default_font)
         
@@ -124,7 +101,7 @@ class VendingGUI(ttk.Window):
         
         # Base button style - simpler and faster
         style.configure('TButton', 
-                      font=('Arial', 16),
+                      font=self._font(16),
                       padding=10,
                       relief='raised',
                       borderwidth=2)
@@ -132,7 +109,7 @@ class VendingGUI(ttk.Window):
         # Button variants with consistent sizing
         for btn_style in ['TButton', 'info.TButton', 'success.TButton', 'danger.TButton', 'secondary.TButton']:
             style.configure(btn_style,
-                          font=('Arial', 16),
+                          font=self._font(16),
                           padding=15,
                           width=15)  # Fixed width for consistency
         
@@ -144,10 +121,15 @@ class VendingGUI(ttk.Window):
         
         # Specific style for large buttons
         style.configure('Large.TButton',
-                      font=('Arial', 20, 'bold'),
+                      font=self._font(20, bold=True),
                       padding=20,
                       width=20)
         
+        # Style for the catalog's top action buttons
+        style.configure('Top.TButton',
+                      font=self._font(18, bold=True),
+                      padding=15)
+        
         # Disable animation for better performance
         style.configure('.',
                       relief='flat',
@@ -157,10 +139,26 @@ class VendingGUI(ttk.Window):
         
         # Initialize variables
         self.current_user = None
-        self.manual_id_var = tk.StringVar()
+        # Keypad input is buffered here and written to the manual entry at idle time
+        self._manual_entry = None
+        self._id_buffer = ""
+        self._id_dirty = False
         self._qr_photo = None
+        # Decoded and resized fallback QR image (PIL), handed over by _warm_qr through _qr_ready
+        self._qr_pil = None
+        self._qr_ready = queue.Queue(maxsize=1)
         self.pending_medicine = None
-        
+
+        # Screens are built once on first use and then swapped in and out
+        self._screens = {}
+        self._current_screen = None
+
+        # Last call time per debounced callback, to drop touchscreen double taps
+        self._last_tap = {}
+
+        # Payment log is opened on the first payment and then kept open
+        self._init_payment_log()
+
         # Set up the main window
         self.geometry(f"{SCREEN_WIDTH}x{SCREEN_HEIGHT}+0+0")
         
@@ -169,8 +167,11 @@ class VendingGUI(ttk.Window):
         self.configure(background='white')
         
         # Create main container
-        self.container = ttk.Frame(self)
-        self.container.pack(fill=BOTH, expand=True, padx=20, pady=20)
+        self._create_container()
+
+        # Decode the payment QR while the kiosk sits on the welcome screen
+        threading.Thread(target=self._warm_qr, daemon=True).start()
+        self.after(100, self._poll_qr)
         
         # Set up fullscreen mode
         self._is_fullscreen = True
@@ -191,286 +192,325 @@ class VendingGUI(ttk.Window):
         # Show welcome screen with a small delay to ensure window is ready
         self.after(100, self.show_welcome)
 
-    def clear_screen(self):
-        """Clear all widgets from the window."""
-        if not hasattr(self, 'container') or not self.container.winfo_exists():
-            # Recreate container if it doesn't exist
-            self.container = ttk.Frame(self)
-            self.container.pack(fill=BOTH, expand=True)
-            return
-            
-        # Safely destroy all child widgets
-        for widget in self.container.winfo_children():
-            try:
-                if widget.winfo_exists():
-                    widget.destroy()
-            except Exception as e:
-                print(f"Warning: Error destroying widget: {e}")
-        
-        # Force update to ensure widgets are destroyed
-        self.update_idletasks()
+    def _font(self, size, bold=False):
+        """Return a shared named Arial font so Tk resolves each size/weight only once."""
+        key = (size, bold)
+        font = self._fonts.get(key)
+        if font is None:
+            font = tkfont.Font(root=self, family='Arial', size=size, weight='bold' if bold else 'normal')
+            self._fonts[key] = font
+        return font
+
+    def _create_container(self):
+        """Create the frame that holds the stacked screens."""
+        self.container = ttk.Frame(self)
+        self.container.pack(fill=BOTH, expand=True, padx=20, pady=20)
+        # Every screen sits in the same cell; the visible one is raised to the top
+        self.container.grid_rowconfigure(0, weight=1)
+        self.container.grid_columnconfigure(0, weight=1)
+        self._screens = {}
+        self._current_screen = None
+
+    def _show(self, name):
+        """Raise the named screen, building its widgets on first use."""
+        screen = self._screens.get(name)
+        if screen is None or not screen.winfo_exists():
+            screen = getattr(self, f"_build_{name}")()
+            screen.grid(row=0, column=0, sticky="nsew")
+            self._screens[name] = screen
+
+        if self._current_screen is not screen:
+            screen.tkraise()
+            self._current_screen = screen
+        return screen
+
+    def _build_welcome(self):
+        """Build the welcome screen with options to scan or enter ID manually."""
+        # Main container with padding
+        main_frame = ttk.Frame(self.container, padding=20)
+
+        # Header
+        header = ttk.Frame(main_frame)
+        header.pack(fill=X, pady=(20, 10))
+
+        title_label = ttk.Label(
+            header,
+            text="Medicine Vending Machine",
+            font=self._font(24, bold=True),
+            bootstyle='primary'
+        )
+        title_label.pack(pady=(0, 10))
+
+        # Welcome message
+        ttk.Label(
+            main_frame,
+            text="Welcome!",
+            font=self._font(22, bold=True),
+            bootstyle='secondary'
+        ).pack(pady=(10, 20))
+
+        # Instruction
+        ttk.Label(
+            main_frame,
+            text="Please scan your barcode or enter your ID",
+            font=self._font(16),
+            bootstyle='secondary'
+        ).pack(pady=(0, 30))
+
+        # Action buttons frame
+        btn_frame = ttk.Frame(main_frame)
+        btn_frame.pack(expand=True, fill=BOTH, pady=10)
+
+        # Scan button
+        ttk.Button(
+            btn_frame,
+            text="📷 Scan Barcode",
+            style='info.TButton',
+            command=self.show_scan_instructions
+        ).pack(pady=10, fill=X)
+
+        # Manual entry button
+        ttk.Button(
+            btn_frame,
+            text="⌨️ Enter ID Manually",
+            style='secondary.TButton',
+            command=self.show_manual_id_entry
+        ).pack(pady=10, fill=X)
+
+        # Add some space at the bottom
+        ttk.Frame(btn_frame, height=20).pack()
+        return main_frame
 
     def show_welcome(self):
         """Display welcome screen with options to scan or enter ID manually."""
         # Reset all state variables
         self.current_user = None
         self.pending_medicine = None
-        self.manual_id_var.set("")  # Clear the ID input
-        
-        # Clear and set up the main container
-        self.clear_screen()
-        
+        self._id_buffer = ""  # Clear the ID input
+        self._id_dirty = True
+        self._flush_id()
+
         # Ensure we have a valid container
         if not hasattr(self, 'container') or not self.container.winfo_exists():
-            self.container = ttk.Frame(self)
-            self.container.pack(fill=BOTH, expand=True)
-        
+            self._create_container()
+
         try:
-            # Main container with padding
-            main_frame = ttk.Frame(self.container, padding=20)
-            main_frame.pack(fill=BOTH, expand=True)
-            
-            # Header
-            header = ttk.Frame(main_frame)
-            header.pack(fill=X, pady=(20, 10))
-            
-            title_label = ttk.Label(
-                header, 
-                text="Medicine Vending Machine", 
-                font=('Arial', 24, 'bold'), 
-                bootstyle='primary'
-            )
-            title_label.pack(pady=(0, 10))
-            
-            # Welcome message
-            ttk.Label(
-                main_frame,
-                text="Welcome!",
-                font=('Arial', 22, 'bold'),
-                bootstyle='secondary'
-            ).pack(pady=(10, 20))
-            
-            # Instruction
-            ttk.Label(
-                main_frame, 
-                text="Please scan your barcode or enter your ID", 
-                font=('Arial', 16),
-                bootstyle='secondary'
-            ).pack(pady=(0, 30))
-            
-            # Action buttons frame
-            btn_frame = ttk.Frame(main_frame)
-            btn_frame.pack(expand=True, fill=BOTH, pady=10)
-            
-            # Scan button
-            ttk.Button(
-                btn_frame,
-                text="📷 Scan Barcode",
-                style='info.TButton',
-                command=self.show_scan_instructions,
-                padding=15
-            ).pack(pady=10, fill=X)
-            
-            # Manual entry button
-            ttk.Button(
-                btn_frame,
-                text="⌨️ Enter ID Manually",
-                style='secondary.TButton',
-                command=self.show_manual_id_entry,
-                padding=15
-            ).pack(pady=10, fill=X)
-            
-            # Add some space at the bottom
-            ttk.Frame(btn_frame, height=20).pack()
-            
+            self._show("welcome")
+
         except Exception as e:
             print(f"Critical error in show_welcome: {str(e)}")
             # Last resort recovery
             try:
-                # Try to completely reset the UI
-                for widget in self.winfo_children():
+                # Reset the screens but keep the container (and its bindings) alive
+                if not self.container.winfo_exists():
+                    self._create_container()
+                for widget in self.container.winfo_children():
                     widget.destroy()
-                
-                # Recreate the main container
-                self.container = ttk.Frame(self)
-                self.container.pack(fill=BOTH, expand=True)
-                
+                self._screens.clear()
+                self._manual_entry = None  # destroyed with the manual screen
+
                 # Show minimal recovery UI
+                recovery = ttk.Frame(self.container)
+                recovery.grid(row=0, column=0, sticky="nsew")
+                self._current_screen = recovery
+
                 ttk.Label(
-                    self.container,
+                    recovery,
                     text="Welcome to Medicine Vending Machine",
-                    font=('Arial', 20, 'bold'),
+                    font=self._font(20, bold=True),
                     bootstyle='primary'
                 ).pack(pady=50)
-                
+
                 ttk.Button(
-                    self.container,
+                    recovery,
                     text="Start",
                     command=self.show_welcome,
-                    style='info.TButton',
-                    padding=15
+                    style='info.TButton'
                 ).pack(pady=20)
-                
+
             except Exception as inner_e:
                 print(f"Fatal error during recovery: {str(inner_e)}")
                 # If we get here, the UI is in an unrecoverable state
                 self.destroy()
                 self.quit()
 
-    def show_scan_instructions(self):
-        """Show simple scan instructions screen (placeholder for future auto-scan)."""
-        self.clear_screen()
-        
-        # Create a frame in the container
-        frame = ttk.Frame(self.container)
+    def _build_scan(self):
+        """Build the scan instructions screen."""
+        # Outer frame fills the container; content stays centred inside it
+        screen = ttk.Frame(self.container)
+        frame = ttk.Frame(screen)
         frame.pack(expand=True)
-        
+
         ttk.Label(
             frame,
             text="Scan your barcode now",
-            font=("Arial", 22),
+            font=self._font(22),
             bootstyle="primary"
         ).pack(pady=20)
-        
+
         ttk.Label(
             frame,
             text="After scanning, the system will process your ID.",
-            font=("Arial", 14)
+            font=self._font(14)
         ).pack(pady=10)
-        
+
         ttk.Button(
             frame,
             text="Back",
             command=self.show_welcome,
             style="secondary.TButton"
         ).pack(pady=20)
+        return screen
+
+    def show_scan_instructions(self):
+        """Show simple scan instructions screen (placeholder for future auto-scan)."""
+        self._show("scan")
+
+    def _build_manual(self):
+        """Build the on-screen keypad for manual ID entry."""
+        screen = ttk.Frame(self.container)
+
+        # Configure grid for the screen to be more responsive
+        screen.grid_columnconfigure(0, weight=1)
+        screen.grid_rowconfigure(0, weight=1)
+
+        # Main frame with grid layout for better performance
+        main_frame = ttk.Frame(screen)
+        main_frame.grid(row=0, column=0, sticky="nsew", padx=20, pady=20)
+
+        # Configure main frame grid
+        main_frame.grid_columnconfigure(0, weight=1)
+        for i in range(4):  # Title, Entry, Keypad, Buttons
+            main_frame.grid_rowconfigure(i, weight=1)
+
+        # Title (row 0)
+        ttk.Label(
+            main_frame,
+            text="Enter Your ID",
+            font=self._font(22, bold=True)
+        ).grid(row=0, sticky="s", pady=(0, 10))
+
+        # Entry field (row 1)
+        self._manual_entry = ttk.Entry(
+            main_frame,
+            font=self._font(20),
+            justify="center",
+            width=15
+        )
+        self._manual_entry.grid(row=1, sticky="n", pady=10)
+
+        # Keypad frame (row 2)
+        keypad_frame = ttk.Frame(main_frame)
+        keypad_frame.grid(row=2, sticky="n", pady=10)
+
+        # Configure keypad grid
+        for i in range(4):
+            keypad_frame.grid_rowconfigure(i, weight=1)
+        for i in range(3):
+            keypad_frame.grid_columnconfigure(i, weight=1)
+
+        # Keypad buttons only override width; everything else comes from the named styles
+        button_styles = {
+            'digit': 'primary.TButton',
+            'clear': 'danger.TButton',
+            'back': 'warning.TButton'
+        }
+
+        # Create buttons with optimized layout
+        buttons = [
+            ("1", 0, 0), ("2", 0, 1), ("3", 0, 2),
+            ("4", 1, 0), ("5", 1, 1), ("6", 1, 2),
+            ("7", 2, 0), ("8", 2, 1), ("9", 2, 2),
+            ("Clear", 3, 0), ("0", 3, 1), ("⌫", 3, 2)
+        ]
+
+        for text, row, col in buttons:
+            if text.isdigit():
+                cmd = functools.partial(self.append_digit, text)
+                style = button_styles['digit']
+            elif text == "Clear":
+                cmd = self.clear_id
+                style = button_styles['clear']
+            else:  # backspace
+                cmd = self.backspace_id
+                style = button_styles['back']
+
+            ttk.Button(
+                keypad_frame,
+                text=text,
+                style=style,
+                width=6,
+                command=cmd
+            ).grid(row=row, column=col, padx=5, pady=5, sticky="nsew")
+
+        # Action buttons (row 3)
+        btn_frame = ttk.Frame(main_frame)
+        btn_frame.grid(row=3, sticky="n", pady=20)
+
+        btn_frame.grid_columnconfigure(0, weight=1)
+        btn_frame.grid_columnconfigure(1, weight=1)
+
+        # Submit button
+        ttk.Button(
+            btn_frame,
+            text="Submit",
+            style='success.TButton',
+            command=self.submit_manual_id
+        ).grid(row=0, column=0, padx=10)
+
+        # Back button
+        ttk.Button(
+            btn_frame,
+            text="Back",
+            style='secondary.TButton',
+            command=self.show_welcome
+        ).grid(row=0, column=1, padx=10)
+        return screen
 
     def show_manual_id_entry(self):
         """Display on-screen keypad for manual ID entry."""
         try:
-            self.clear_screen()
-            
-            # Configure grid for main container to be more responsive
-            self.container.grid_columnconfigure(0, weight=1)
-            self.container.grid_rowconfigure(0, weight=1)
-            
-            # Main frame with grid layout for better performance
-            main_frame = ttk.Frame(self.container)
-            main_frame.grid(row=0, column=0, sticky="nsew", padx=20, pady=20)
-            
-            # Configure main frame grid
-            main_frame.grid_columnconfigure(0, weight=1)
-            for i in range(4):  # Title, Entry, Keypad, Buttons
-                main_frame.grid_rowconfigure(i, weight=1)
-            
-            # Title (row 0)
-            ttk.Label(
-                main_frame,
-                text="Enter Your ID",
-                font=('Arial', 22, 'bold')
-            ).grid(row=0, sticky="s", pady=(0, 10))
-            
-            # Entry field (row 1)
-            entry = ttk.Entry(
-                main_frame,
-                textvariable=self.manual_id_var,
-                font=('Arial', 20),
-                justify="center",
-                width=15
-            )
-            entry.grid(row=1, sticky="n", pady=10)
-            self.after(100, entry.focus_set)  # Delay focus for better performance
-            
-            # Keypad frame (row 2)
-            keypad_frame = ttk.Frame(main_frame)
-            keypad_frame.grid(row=2, sticky="n", pady=10)
-            
-            # Configure keypad grid
-            for i in range(4):
-                keypad_frame.grid_rowconfigure(i, weight=1)
-            for i in range(3):
-                keypad_frame.grid_columnconfigure(i, weight=1)
-            
-            # Pre-define button styles for better performance
-            button_styles = {
-                'digit': 'primary.TButton',
-                'clear': 'danger.TButton',
-                'back': 'warning.TButton'
-            }
-            
-            # Create buttons with optimized layout
-            buttons = [
-                ("1", 0, 0), ("2", 0, 1), ("3", 0, 2),
-                ("4", 1, 0), ("5", 1, 1), ("6", 1, 2),
-                ("7", 2, 0), ("8", 2, 1), ("9", 2, 2),
-                ("Clear", 3, 0), ("0", 3, 1), ("⌫", 3, 2)
-            ]
-            
-            for text, row, col in buttons:
-                if text.isdigit():
-                    cmd = lambda t=text: self.append_digit(t)
-                    style = button_styles['digit']
-                elif text == "Clear":
-                    cmd = self.clear_id
-                    style = button_styles['clear']
-                else:  # backspace
-                    cmd = self.backspace_id
-                    style = button_styles['back']
-                
-                ttk.Button(
-                    keypad_frame,
-                    text=text,
-                    style=style,
-                    width=6,
-                    command=cmd
-                ).grid(row=row, column=col, padx=5, pady=5, sticky="nsew")
-            
-            # Action buttons (row 3)
-            btn_frame = ttk.Frame(main_frame)
-            btn_frame.grid(row=3, sticky="n", pady=20)
-            
-            btn_frame.grid_columnconfigure(0, weight=1)
-            btn_frame.grid_columnconfigure(1, weight=1)
-            
-            # Submit button
-            ttk.Button(
-                btn_frame,
-                text="Submit",
-                style='success.TButton',
-                width=15,
-                command=self.submit_manual_id
-            ).grid(row=0, column=0, padx=10)
-            
-            # Back button
-            ttk.Button(
-                btn_frame,
-                text="Back",
-                style='secondary.TButton',
-                width=15,
-                command=self.show_welcome
-            ).grid(row=0, column=1, padx=10)
-            
-            # Force geometry calculation
-            self.update_idletasks()
-            
+            self._show("manual")
+            self.after(100, self._manual_entry.focus_set)  # Delay focus for better performance
+
         except Exception as e:
             print(f"Error in manual ID entry: {e}")
             self.show_error("Error showing keypad. Please try again.")
 
+    def _id_input(self):
+        """Current ID text, picking up anything typed straight into the entry since the last flush."""
+        if not self._id_dirty and self._manual_entry is not None and self._manual_entry.winfo_exists():
+            self._id_buffer = self._manual_entry.get()
+        return self._id_buffer
+
+    def _set_id_input(self, value):
+        """Buffer the new ID text and push it to the entry once Tk is idle."""
+        self._id_buffer = value
+        if not self._id_dirty:
+            self._id_dirty = True
+            self.after_idle(self._flush_id)
+
+    def _flush_id(self):
+        """Write the buffered ID to the entry in a single update."""
+        if self._id_dirty:
+            if self._manual_entry is not None and self._manual_entry.winfo_exists():
+                self._manual_entry.delete(0, tk.END)
+                self._manual_entry.insert(0, self._id_buffer)
+            self._id_dirty = False
+
     def append_digit(self, d):
-        current = self.manual_id_var.get()
-        self.manual_id_var.set(current + d)
+        self._set_id_input(self._id_input() + d)
 
     def backspace_id(self):
-        current = self.manual_id_var.get()
+        current = self._id_input()
         if current:
-            self.manual_id_var.set(current[:-1])
+            self._set_id_input(current[:-1])
 
     def clear_id(self):
-        self.manual_id_var.set("")
+        self._set_id_input("")
 
     def _toggle_fullscreen_event(self, event=None):
-        """Toggle fullscreen mode with F11 key."""
+        """Toggle fullscreen mode via F11 for testing without rebooting the Pi."""
         self._is_fullscreen = not self._is_fullscreen
         try:
             self.attributes("-fullscreen", self._is_fullscreen)
@@ -478,6 +518,7 @@ class VendingGUI(ttk.Window):
                 self.attributes("-zoomed", False)
         except Exception as e:
             print(f"Error toggling fullscreen: {e}")
+        return "break"
 
     def safe_exit(self, event=None):
         """Safely exit the application."""
@@ -487,31 +528,33 @@ class VendingGUI(ttk.Window):
             import os
             os._exit(0)
 
+    def _build_loading(self):
+        """Build the loading screen shown while an ID is verified."""
+        loading_frame = ttk.Frame(self.container)
+
+        loading_label = ttk.Label(
+            loading_frame,
+            text="Verifying ID...",
+            font=self._font(18, bold=True),
+            bootstyle='info'
+        )
+        loading_label.pack(pady=50)
+        return loading_frame
+
+    @debounce()
     def submit_manual_id(self):
         """Handle manual ID submission with better error handling."""
         try:
             # Get and clean the input
-            user_id = self.manual_id_var.get().strip()
+            user_id = self._id_input().strip()
             
             # Validate input
             if not user_id:
                 self.show_error("Please enter a valid ID")
                 return
             
-            # Clear and show loading state
-            self.clear_screen()
-            
-            # Create a new frame for loading content
-            loading_frame = ttk.Frame(self.container)
-            loading_frame.pack(expand=True, fill=BOTH)
-            
-            loading_label = ttk.Label(
-                loading_frame,
-                text="Verifying ID...",
-                font=('Arial', 18, 'bold'),
-                bootstyle='info'
-            )
-            loading_label.pack(pady=50)
+            # Show loading state
+            self._show("loading")
             
             # Force UI update
             self.update_idletasks()
@@ -531,149 +574,151 @@ class VendingGUI(ttk.Window):
             self.show_error("An error occurred. Please try again.")
             self.after(1500, self.show_manual_id_entry)
 
-    def show_catalog(self, user):
-        """Display medicine catalog in a 3x3 grid for touchscreen."""
-        def create_med_button(parent, med, row, col):
-            """Create a medicine button with fixed size and touch-friendly padding."""
-            frame = ttk.Frame(parent, padding=5)
-            frame.grid(row=row, column=col, padx=5, pady=5, sticky="nsew")
-            frame.columnconfigure(0, weight=1)
-            frame.rowconfigure(0, weight=1)
-            
-            stock = med.get('stock', 0)
-            name = med.get('name', 'Unknown')
-            price = med.get('price', 0)
-            
-            if stock <= 0:
-                btn_text = f"{name}\nOut of Stock"
-                style = 'danger.TButton'
-            else:
-                btn_text = f"{name}\n₹{price:.2f}\nStock: {stock}"
-                style = 'primary.TButton'
-            
-            btn = ttk.Button(
-                frame,
-                text=btn_text,
-                style=style,
-                command=lambda m=med: self.select_medicine(m)
-            )
+    def _build_catalog(self):
+        """Build the static parts of the catalog; medicine buttons are filled in by show_catalog."""
+        # Main container with padding
+        main_frame = ttk.Frame(self.container, padding=5)
+
+        # Top action buttons first
+        action_frame = ttk.Frame(main_frame)
+        action_frame.pack(fill=X, pady=5)
+
+        # Action buttons with enhanced configuration in the top
+        select_symptoms_btn = tk.Button(
+            action_frame,
+            text="🔍 Select Symptoms",
+            font=self._font(18, bold=True),
+            bg='#0d6efd',  # Bootstrap primary blue
+            fg='white',
+            relief='raised',
+            command=self.show_mcq,
+            padx=20,
+            pady=10,
+            cursor='hand2'
+        )
+        select_symptoms_btn.grid(row=0, column=0, padx=5, pady=5, sticky="nsew")
+
+        # Bind hover effects
+        select_symptoms_btn.bind('<Enter>', lambda e: select_symptoms_btn.configure(bg='#0b5ed7'))
+        select_symptoms_btn.bind('<Leave>', lambda e: select_symptoms_btn.configure(bg='#0d6efd'))
+
+        home_btn = tk.Button(
+            action_frame,
+            text="🏠 Home",
+            font=self._font(18, bold=True),
+            bg='#6c757d',  # Bootstrap secondary gray
+            fg='white',
+            relief='raised',
+            command=self.show_welcome,
+            padx=20,
+            pady=10,
+            cursor='hand2'
+        )
+        home_btn.grid(row=0, column=1, padx=5, pady=5, sticky="nsew")
+
+        # Bind hover effects
+        home_btn.bind('<Enter>', lambda e: home_btn.configure(bg='#5c636a'))
+        home_btn.bind('<Leave>', lambda e: home_btn.configure(bg='#6c757d'))
+
+        # Configure columns for equal width
+        action_frame.columnconfigure(0, weight=1)
+        action_frame.columnconfigure(1, weight=1)
+
+        # Header with user info and logout below the action buttons
+        header = ttk.Frame(main_frame)
+        header.pack(fill=X, pady=10)
+
+        # User name is filled in by show_catalog
+        self._catalog_user_label = ttk.Label(
+            header,
+            font=self._font(18, bold=True),
+            bootstyle='primary'
+        )
+        self._catalog_user_label.pack(side=LEFT, fill=X, expand=True)
+
+        # Logout button
+        ttk.Button(
+            header,
+            text="🔒 Logout",
+            style='danger.TButton',
+            command=self.show_welcome
+        ).pack(side=RIGHT, padx=5)
+
+        # Title for medicine selection
+        ttk.Label(
+            main_frame,
+            text="Select a Medicine",
+            font=self._font(20, bold=True),
+            bootstyle='secondary'
+        ).pack(pady=(10, 10))
+
+        # Medicine grid (3x3)
+        self._catalog_grid = ttk.Frame(main_frame)
+        self._catalog_grid.pack(fill=BOTH, expand=True, pady=5)
+
+        # Configure grid layout
+        for i in range(3):  # 3 rows
+            self._catalog_grid.rowconfigure(i, weight=1, uniform='row')
+        for i in range(3):  # 3 columns
+            self._catalog_grid.columnconfigure(i, weight=1, uniform='col')
+
+        # Nine reusable medicine buttons; show_catalog fills them in and hides the unused ones
+        self._catalog_buttons = []
+        for i in range(9):
+            cell = ttk.Frame(self._catalog_grid, padding=5)
+            cell.grid(row=i // 3, column=i % 3, padx=5, pady=5, sticky="nsew")
+            cell.columnconfigure(0, weight=1)
+            cell.rowconfigure(0, weight=1)
+            btn = ttk.Button(cell, style='primary.TButton')
             btn.pack(fill=BOTH, expand=True)
-            return frame
+            cell.grid_remove()
+            self._catalog_buttons.append((cell, btn))
+
+        # Shown in place of the buttons when there is nothing to list
+        self._catalog_message = ttk.Frame(self._catalog_grid)
+        self._catalog_message.grid(row=0, column=0, columnspan=3, pady=50)
+        self._catalog_message_title = ttk.Label(self._catalog_message)
+        self._catalog_message_title.pack(pady=(0, 10))
+        self._catalog_message_hint = ttk.Label(self._catalog_message, font=self._font(14), bootstyle='secondary')
+        self._catalog_message_hint.pack()
+        self._catalog_message.grid_remove()
 
+        # Space at the bottom
+        ttk.Frame(main_frame, height=20).pack(pady=10)
+        return main_frame
+
+    def _show_catalog_message(self, title, hint="", error=False):
+        """Hide the medicine buttons and show a message in the catalog grid instead."""
+        for cell, _btn in self._catalog_buttons:
+            cell.grid_remove()
+        self._catalog_message_title.configure(
+            text=title,
+            font=self._font(16, bold=error),
+            bootstyle='danger' if error else 'warning'
+        )
+        self._catalog_message_hint.configure(text=hint)
+        self._catalog_message.grid()
+
+    def show_catalog(self, user):
+        """Display medicine catalog in a 3x3 grid for touchscreen."""
         try:
-            self.clear_screen()
+            self._show("catalog")
             
             # Store user in instance variable if not already set
             if not hasattr(self, 'current_user') or not self.current_user:
                 self.current_user = user
             
-            # Main container with padding
-            main_frame = ttk.Frame(self.container, padding=5)
-            main_frame.pack(fill=BOTH, expand=True)
-            
-            # Top action buttons first
-            action_frame = ttk.Frame(main_frame)
-            action_frame.pack(fill=X, pady=5)
-            
-            # Create separate styles for top buttons
-            style = ttk.Style()
-            style.configure('Top.TButton', 
-                          font=('Arial', 18, 'bold'),
-                          padding=15)
-            
-            # Action buttons with enhanced configuration in the top
-            select_symptoms_btn = tk.Button(
-                action_frame,
-                text="🔍 Select Symptoms",
-                font=('Arial', 18, 'bold'),
-                bg='#0d6efd',  # Bootstrap primary blue
-                fg='white',
-                relief='raised',
-                command=self.show_mcq,
-                padx=20,
-                pady=10,
-                cursor='hand2'
-            )
-            select_symptoms_btn.grid(row=0, column=0, padx=5, pady=5, sticky="nsew")
-            
-            # Bind hover effects
-            select_symptoms_btn.bind('<Enter>', lambda e: select_symptoms_btn.configure(bg='#0b5ed7'))
-            select_symptoms_btn.bind('<Leave>', lambda e: select_symptoms_btn.configure(bg='#0d6efd'))
-            
-            home_btn = tk.Button(
-                action_frame,
-                text="🏠 Home",
-                font=('Arial', 18, 'bold'),
-                bg='#6c757d',  # Bootstrap secondary gray
-                fg='white',
-                relief='raised',
-                command=self.show_welcome,
-                padx=20,
-                pady=10,
-                cursor='hand2'
-            )
-            home_btn.grid(row=0, column=1, padx=5, pady=5, sticky="nsew")
-            
-            # Bind hover effects
-            home_btn.bind('<Enter>', lambda e: home_btn.configure(bg='#5c636a'))
-            home_btn.bind('<Leave>', lambda e: home_btn.configure(bg='#6c757d'))
-            
-            # Configure columns for equal width
-            action_frame.columnconfigure(0, weight=1)
-            action_frame.columnconfigure(1, weight=1)
-
-            # Header with user info and logout below the action buttons
-            header = ttk.Frame(main_frame)
-            header.pack(fill=X, pady=10)
-            
             # Display user name or ID if name is not available
             user_display = f"User ID: {self.current_user.get('id', 'N/A')}"
             if 'name' in self.current_user and self.current_user['name']:
                 user_display = self.current_user['name']
-                
-            ttk.Label(
-                header,
-                text=user_display,
-                font=('Arial', 18, 'bold'),
-                bootstyle='primary'
-            ).pack(side=LEFT, fill=X, expand=True)
-            
-            # Logout button
-            ttk.Button(
-                header,
-                text="🔒 Logout",
-                style='danger.TButton',
-                command=self.show_welcome
-            ).pack(side=RIGHT, padx=5)
-            
-            # Title for medicine selection
-            ttk.Label(
-                main_frame,
-                text="Select a Medicine",
-                font=('Arial', 20, 'bold'),
-                bootstyle='secondary'
-            ).pack(pady=(10, 10))
-            
-            # Medicine grid (3x3)
-            grid_frame = ttk.Frame(main_frame)
-            grid_frame.pack(fill=BOTH, expand=True, pady=5)
-            
-            # Configure grid layout
-            for i in range(3):  # 3 rows
-                grid_frame.rowconfigure(i, weight=1, uniform='row')
-            for i in range(3):  # 3 columns
-                grid_frame.columnconfigure(i, weight=1, uniform='col')
+            self._catalog_user_label.configure(text=user_display)
             
             # Load and display medicines
             try:
                 medicines = load_medicines()
                 if not medicines:
-                    ttk.Label(
-                        grid_frame,
-                        text="No medicines available.",
-                        font=('Arial', 16),
-                        bootstyle='warning'
-                    ).grid(row=0, column=0, columnspan=3, pady=50)
+                    self._show_catalog_message("No medicines available.")
                 else:
                     # Convert medicines dictionary to list of items with their IDs
                     medicine_items = [
@@ -685,52 +730,51 @@ class VendingGUI(ttk.Window):
                     medicine_items.sort(key=lambda x: x.get('slot', 999))
                     displayed_items = medicine_items[:9]
                     
-                    # Display in grid
-                    for i, med in enumerate(displayed_items):
-                        row = i // 3
-                        col = i % 3
-                        create_med_button(grid_frame, med, row, col)
-                        
                     # If no medicines were displayed, show message
                     if not displayed_items:
-                        ttk.Label(
-                            grid_frame,
-                            text="No valid medicines configured.",
-                            font=('Arial', 16),
-                            bootstyle='warning'
-                        ).grid(row=0, column=0, columnspan=3, pady=50)
+                        self._show_catalog_message("No valid medicines configured.")
+                    else:
+                        self._catalog_message.grid_remove()
+                    
+                    # Reuse the prebuilt buttons; only their text, style and command change
+                    for i, (cell, btn) in enumerate(self._catalog_buttons):
+                        if i >= len(displayed_items):
+                            cell.grid_remove()
+                            continue
+                        
+                        med = displayed_items[i]
+                        stock = med.get('stock', 0)
+                        name = med.get('name', 'Unknown')
+                        price = med.get('price', 0)
+                        
+                        if stock <= 0:
+                            btn_text = f"{name}\nOut of Stock"
+                            style = 'danger.TButton'
+                        else:
+                            btn_text = f"{name}\n₹{price:.2f}\nStock: {stock}"
+                            style = 'primary.TButton'
+                        
+                        btn.configure(
+                            text=btn_text,
+                            style=style,
+                            command=functools.partial(self.select_medicine, med)
+                        )
+                        cell.grid()
                         
             except Exception as e:
                 print(f"Error loading medicines: {e}")
-                # Create an error display frame
-                error_frame = ttk.Frame(grid_frame)
-                error_frame.grid(row=0, column=0, columnspan=3, pady=20)
-                
-                ttk.Label(
-                    error_frame,
-                    text="Error loading medicine list",
-                    font=('Arial', 16, 'bold'),
-                    bootstyle='danger'
-                ).pack(pady=(0, 10))
-                
-                ttk.Label(
-                    error_frame,
-                    text="Please check medicines.json file",
-                    font=('Arial', 14),
-                    bootstyle='secondary'
-                ).pack()
-            
-            # Space at the bottom
-            ttk.Frame(main_frame, height=20).pack(pady=10)
-            
-            # Force UI update
-            self.update_idletasks()
+                self._show_catalog_message(
+                    "Error loading medicine list",
+                    "Please check medicines.json file",
+                    error=True
+                )
             
         except Exception as e:
             print(f"Error in show_catalog: {str(e)}")
             self.show_error("Failed to load catalog. Please try again.")
             self.after(1000, self.show_welcome)
 
+    @debounce()
     def select_medicine(self, medicine):
         """Handle medicine selection and dispense, then go to payment screen."""
         try:
@@ -750,26 +794,36 @@ class VendingGUI(ttk.Window):
             print(f"Error dispensing medicine: {e}")
             self.show_error("An error occurred while processing your request.")
 
+    def _build_mcq(self):
+        """Build the questionnaire screen; the question and options are filled in by show_mcq."""
+        screen = ttk.Frame(self.container)
+        frame = ttk.Frame(screen)
+        frame.pack(expand=True)
+
+        self._mcq_question_label = ttk.Label(
+            frame,
+            font=self._font(18),
+            bootstyle="primary"
+        )
+        self._mcq_question_label.pack(pady=20)
+
+        self._mcq_options = ttk.Frame(frame)
+        self._mcq_options.pack()
+        return screen
+
     def show_mcq(self):
         """Display symptoms questionnaire to help select appropriate medicine."""
-        self.clear_screen()
-        
-        frame = ttk.Frame(self.container)
-        frame.pack(expand=True)
-        
         questionnaire = load_questionnaire()
         if "questions" in questionnaire and questionnaire["questions"]:
+            self._show("mcq")
             question = questionnaire["questions"][0]
-            ttk.Label(
-                frame,
-                text=question["text"],
-                font=("Arial", 18),
-                bootstyle="primary"
-            ).pack(pady=20)
+            self._mcq_question_label.configure(text=question["text"])
             
+            for widget in self._mcq_options.winfo_children():
+                widget.destroy()
             for option in question["options"]:
                 ttk.Button(
-                    frame,
+                    self._mcq_options,
                     text=option["text"],
                     style="info.TButton",
                     command=lambda o=option: self.recommend_medicine(o["medicine"]),
@@ -777,185 +831,264 @@ class VendingGUI(ttk.Window):
         else:
             self.show_error("No questionnaire available")
 
+    def _build_recommend(self):
+        """Build the recommendation confirmation screen."""
+        screen = ttk.Frame(self.container)
+        frame = ttk.Frame(screen)
+        frame.pack(expand=True)
+
+        self._recommend_label = ttk.Label(
+            frame,
+            font=self._font(20),
+            bootstyle="primary"
+        )
+        self._recommend_label.pack(pady=20)
+
+        ttk.Button(
+            frame,
+            text="✓ Confirm",
+            style="success.TButton",
+            command=lambda: self.select_medicine(self._recommended_medicine)
+        ).pack(pady=10)
+
+        ttk.Button(
+            frame,
+            text="✗ Cancel",
+            style="danger.TButton",
+            command=lambda: self.show_catalog(self.current_user)
+        ).pack(pady=10)
+        return screen
+
     def recommend_medicine(self, med_id):
         """Show recommended medicine for confirmation."""
-        self.clear_screen()
-        
-        frame = ttk.Frame(self.container)
-        frame.pack(expand=True)
-        
         medicines = load_medicines()
         if med_id in medicines:
             med = medicines[med_id]
-            ttk.Label(
-                frame,
-                text=f"Recommended: {med['name']}",
-                font=("Arial", 20),
-                bootstyle="primary"
-            ).pack(pady=20)
-            
-            ttk.Button(
-                frame,
-                text="✓ Confirm",
-                style="success.TButton",
-                command=lambda: self.select_medicine(med)
-            ).pack(pady=10)
-            
-            ttk.Button(
-                frame,
-                text="✗ Cancel",
-                style="danger.TButton",
-                command=lambda: self.show_catalog(self.current_user)
-            ).pack(pady=10)
+            self._show("recommend")
+            self._recommended_medicine = med
+            self._recommend_label.configure(text=f"Recommended: {med['name']}")
         else:
             self.show_error("Medicine not found")
 
-    def show_payment_screen(self, medicine):
-        """Show payment screen with QR code and payment options."""
-        price = medicine.get('price', 0)
-        self.clear_screen()
-        
+    def _build_payment(self):
+        """Build the payment screen; amount and QR image are filled in by show_payment_screen."""
         # Main container with padding
         container = ttk.Frame(self.container, padding=20)
-        container.pack(fill=BOTH, expand=True)
-        
+
         # Title at the top
         ttk.Label(
-            container, 
-            text="Payment", 
-            font=('Arial', 28, 'bold'),
+            container,
+            text="Payment",
+            font=self._font(28, bold=True),
             bootstyle='primary'
         ).pack(pady=(0, 20))
 
         # Create horizontal layout
         content_frame = ttk.Frame(container)
         content_frame.pack(fill=BOTH, expand=True)
-        
+
         # Left side - QR Code
         qr_frame = ttk.Frame(content_frame, padding=20)
         qr_frame.pack(side=LEFT, fill=BOTH, expand=True)
-        
+
         # Right side - Payment info and buttons
         info_frame = ttk.Frame(content_frame, padding=20)
         info_frame.pack(side=RIGHT, fill=BOTH, expand=True)
-        
+
         # Amount display in info frame
         amount_frame = ttk.Frame(info_frame)
         amount_frame.pack(fill=X, pady=(0, 20))
-        
+
         ttk.Label(
-            amount_frame, 
-            text="Total Amount:", 
-            font=('Arial', 24)
+            amount_frame,
+            text="Total Amount:",
+            font=self._font(24)
         ).pack(side=LEFT, padx=10)
-        
-        ttk.Label(
-            amount_frame, 
-            text=f"₹{price:.2f}", 
-            font=('Arial', 28, 'bold'),
+
+        self._payment_amount_label = ttk.Label(
+            amount_frame,
+            font=self._font(28, bold=True),
             bootstyle='success'
-        ).pack(side=LEFT, padx=10)
-        
-        # Load QR code image
-        qr_path = os.path.join(os.path.dirname(__file__), "assets", "images", "qr.jpeg")
+        )
+        self._payment_amount_label.pack(side=LEFT, padx=10)
+
+        # QR Code Section (Left Side)
+        qr_label_frame = ttk.LabelFrame(
+            qr_frame,
+            text="Scan QR Code",
+            padding=10,
+            bootstyle='info'
+        )
+        qr_label_frame.pack(fill=BOTH, expand=True)
+
+        # Shows either the QR image or a "not found" message
+        self._payment_qr_label = ttk.Label(qr_label_frame, font=self._font(16))
+        self._payment_qr_label.pack(pady=20, padx=20)
+
+        # Payment Instructions (Right Side)
+        instructions_frame = ttk.LabelFrame(
+            info_frame,
+            text="Payment Instructions",
+            padding=20,
+            bootstyle='info'
+        )
+        instructions_frame.pack(fill=X, pady=20)
+
+        # Instructions
+        ttk.Label(
+            instructions_frame,
+            text="1. Open any UPI app",
+            font=self._font(16)
+        ).pack(anchor='w', pady=5)
+
+        ttk.Label(
+            instructions_frame,
+            text="2. Scan the QR code",
+            font=self._font(16)
+        ).pack(anchor='w', pady=5)
+
+        self._payment_step3_label = ttk.Label(
+            instructions_frame,
+            font=self._font(16)
+        )
+        self._payment_step3_label.pack(anchor='w', pady=5)
+
+        ttk.Label(
+            instructions_frame,
+            text="4. Click 'Payment Done' below",
+            font=self._font(16)
+        ).pack(anchor='w', pady=5)
+
+        # Action buttons in info frame
+        btn_frame = ttk.Frame(info_frame)
+        btn_frame.pack(fill=X, pady=(30, 0))
+
+        # Payment Done button
+        ttk.Button(
+            btn_frame,
+            text="✓ Payment Done",
+            style='success.TButton',
+            command=lambda: self.on_paid(self.pending_medicine, self.pending_medicine.get('price', 0)),
+        ).pack(fill=X, pady=(0, 10))
+
+        # Back button
+        ttk.Button(
+            btn_frame,
+            text="← Back",
+            style='secondary.TButton',
+            command=self.show_welcome,
+        ).pack(fill=X)
+        return container
+
+    def _warm_qr(self):
+        """Decode and resize the fallback QR image off the Tk thread and hand it to _poll_qr.
+
+        Runs on a worker thread, so it must not touch Tk; None is handed over when there is
+        nothing to decode (a PNG, or an error).
+        """
+        qr_img = None
+        if not _QR_AVAILABLE:
+            print(f"QR image not found in: {_QR_IMAGES_DIR}")
+        elif not _QR_PATH.endswith(".png"):
+            try:
+                from PIL import Image
+
+                # Make QR code larger
+                with Image.open(_QR_PATH) as img:
+                    qr_img = img.resize((400, 400), Image.Resampling.LANCZOS)
+            except Exception as e:
+                print(f"Could not preload QR image: {e}")
+        self._qr_ready.put(qr_img)
+
+    def _poll_qr(self):
+        """On the Tk thread, wait for _warm_qr and build the QR PhotoImage from its result."""
+        try:
+            qr_img = self._qr_ready.get_nowait()
+        except queue.Empty:
+            self.after(100, self._poll_qr)
+            return
+        if VendingGUI._qr_photo_cache is None:
+            self._qr_pil = qr_img
+            try:
+                self._payment_qr_photo()
+            except Exception as e:
+                print(f"Could not preload QR image: {e}")
+
+    def _payment_qr_photo(self):
+        """Return the payment QR PhotoImage, decoding and resizing it on first use only."""
+        if not _QR_AVAILABLE:
+            return None
+
+        if VendingGUI._qr_photo_cache is None:
+            if _QR_PATH.endswith(".png"):
+                photo = tk.PhotoImage(file=_QR_PATH)
+            else:
+                # PIL is only needed for this fallback, so it is imported here rather than at startup
+                from PIL import Image, ImageTk
+
+                qr_img = self._qr_pil
+                if qr_img is None:
+                    # Make QR code larger
+                    qr_img = Image.open(_QR_PATH).resize((400, 400), Image.Resampling.LANCZOS)
+                photo = ImageTk.PhotoImage(qr_img)
+                self._qr_pil = None
+            VendingGUI._qr_photo_cache = photo
+        return VendingGUI._qr_photo_cache
+
+    def show_payment_screen(self, medicine):
+        """Show payment screen with QR code and payment options."""
+        price = medicine.get('price', 0)
         
         try:
-            # QR Code Section (Left Side)
-            qr_label_frame = ttk.LabelFrame(
-                qr_frame,
-                text="Scan QR Code",
-                padding=10,
-                bootstyle='info'
-            )
-            qr_label_frame.pack(fill=BOTH, expand=True)
-            
-            if os.path.exists(qr_path):
-                # Load and display the QR code
-                qr_img = Image.open(qr_path)
-                # Make QR code larger
-                qr_img = qr_img.resize((400, 400), Image.Resampling.LANCZOS)
-                self._qr_photo = ImageTk.PhotoImage(qr_img)
-                qr_label = ttk.Label(qr_label_frame, image=self._qr_photo)
-                qr_label.image = self._qr_photo  # Keep reference
-                qr_label.pack(pady=20, padx=20)
+            self._show("payment")
+            self._payment_amount_label.configure(text=f"₹{price:.2f}")
+            self._payment_step3_label.configure(text=f"3. Pay ₹{price:.2f}")
+            
+            self._qr_photo = self._payment_qr_photo()
+            if self._qr_photo is not None:
+                self._payment_qr_label.configure(image=self._qr_photo, text="", bootstyle='default')
+                self._payment_qr_label.image = self._qr_photo  # Keep reference
             else:
-                ttk.Label(
-                    qr_label_frame,
-                    text="QR Code Not Found",
-                    font=('Arial', 16),
-                    bootstyle='danger'
-                ).pack(pady=20)
-                print(f"QR image not found at: {qr_path}")
-            
-            # Payment Instructions (Right Side)
-            instructions_frame = ttk.LabelFrame(
-                info_frame,
-                text="Payment Instructions",
-                padding=20,
-                bootstyle='info'
-            )
-            instructions_frame.pack(fill=X, pady=20)
-            
-            # Instructions
-            ttk.Label(
-                instructions_frame,
-                text="1. Open any UPI app",
-                font=('Arial', 16)
-            ).pack(anchor='w', pady=5)
-            
-            ttk.Label(
-                instructions_frame,
-                text="2. Scan the QR code",
-                font=('Arial', 16)
-            ).pack(anchor='w', pady=5)
-            
-            ttk.Label(
-                instructions_frame,
-                text=f"3. Pay ₹{price:.2f}",
-                font=('Arial', 16)
-            ).pack(anchor='w', pady=5)
-            
-            ttk.Label(
-                instructions_frame,
-                text="4. Click 'Payment Done' below",
-                font=('Arial', 16)
-            ).pack(anchor='w', pady=5)
-            
-            # Action buttons in info frame
-            btn_frame = ttk.Frame(info_frame)
-            btn_frame.pack(fill=X, pady=(30, 0))
-            
-            # Payment Done button
-            ttk.Button(
-                btn_frame,
-                text="✓ Payment Done",
-                style='success.TButton',
-                command=lambda: self.on_paid(medicine, price),
-            ).pack(fill=X, pady=(0, 10))
-            
-            # Back button
-            ttk.Button(
-                btn_frame,
-                text="← Back",
-                style='secondary.TButton',
-                command=self.show_welcome,
-            ).pack(fill=X)
+                self._payment_qr_label.configure(image="", text="QR Code Not Found", bootstyle='danger')
             
         except Exception as e:
             print(f"Error in payment screen: {str(e)}")
             self.show_error("Error displaying payment screen. Please try again.")
 
+    @debounce()
     def on_paid(self, medicine: dict, price: float):
-        """Handle payment confirmation: dispense medicine, update stock, log transaction, print receipt."""
+        """Handle payment confirmation: dispense on a worker thread, then finish in _dispense_done."""
+        try:
+            # The motor runs for about a second; the pulse is timed off the Tk thread so a busy
+            # Tk loop cannot lengthen it
+            self._show("dispensing")
+            threading.Thread(
+                target=self._do_dispense,
+                args=(medicine, price),
+                name="dispense",
+                daemon=True,
+            ).start()
+        except Exception as e:
+            print(f"Error in payment processing: {e}")
+            self.show_error("Error processing payment. Please try again.")
+
+    def _do_dispense(self, medicine: dict, price: float):
+        """Run the motor off the Tk thread and post the result back to it."""
         try:
-            # Attempt to dispense first
             success = dispense(medicine.get("slot"))
+        except Exception as e:
+            print(f"Error during dispensing: {e}")
+            success = False
+        self.after(0, self._dispense_done, medicine, price, success)
+
+    def _dispense_done(self, medicine: dict, price: float, success: bool):
+        """Update stock, log the transaction and print the receipt after a dispense attempt."""
+        try:
             if not success:
                 self.show_error("Failed to dispense medicine. Please contact support.")
                 return
 
             # Update stock after successful dispense
-            from database import load_medicines, save_medicines
             medicines = load_medicines()
             med_id = medicine.get('id')
             
@@ -975,7 +1108,7 @@ class VendingGUI(ttk.Window):
             )
             
             # Print receipt with amount
-            print_order_receipt(
+            print_receipt(
                 user_id=str(self.current_user["id"]),
                 user_name=str(self.current_user.get("name", "")),
                 medicine_name=str(medicine.get("name", "")),
@@ -993,30 +1126,78 @@ class VendingGUI(ttk.Window):
             print(f"Error in payment processing: {e}")
             self.show_error("Error processing payment. Please try again.")
 
+    def _init_payment_log(self) -> None:
+        """Set up payments.csv logging; the file is opened on the first payment, not at startup."""
+        self._payments_csv_path = os.path.join(os.path.dirname(__file__), "data", "payments.csv")
+        self._payments_csv = None
+
+    def _payment_log(self):
+        """Return payments.csv open for appending, opening it (and writing the header if new) on first use."""
+        if self._payments_csv is None:
+            ensure_dir(os.path.dirname(self._payments_csv_path))
+            f = open(self._payments_csv_path, mode="a", newline="", encoding="utf-8", buffering=8192)
+            if f.tell() == 0:
+                f.write(_PAYMENTS_CSV_HEADER)
+                f.flush()
+            self._payments_csv = f
+        return self._payments_csv
+
+    def close_payment_log(self) -> None:
+        """Flush and close payments.csv; registered with atexit by main.py."""
+        if self._payments_csv is not None and not self._payments_csv.closed:
+            self._payments_csv.close()
+
     def log_payment_csv(self, user_id: str, medicine_name: str, amount: float, dt: datetime) -> None:
-        data_dir = os.path.join(os.path.dirname(__file__), "data")
-        ensure_dir(data_dir)
-        csv_path = os.path.join(data_dir, "payments.csv")
-        file_exists = os.path.exists(csv_path)
-        with open(csv_path, mode="a", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            if not file_exists:
-                writer.writerow(["id", "medicine", "amount", "date", "time"])  # header
-            writer.writerow([user_id, medicine_name, f"{amount:.2f}", dt.strftime("%Y-%m-%d"), dt.strftime("%H:%M:%S")])
-        print(f"Payment logged to {csv_path}")
+        # Fields are plain values, so format the row directly instead of going through csv.writer
+        line = f"{user_id},{medicine_name.translate(_CSV_FIELD_TABLE)},{amount:.2f},{dt:%Y-%m-%d},{dt:%H:%M:%S}\r\n"
+        try:
+            f = self._payment_log()
+            f.write(line)
+            # Hand the row to the OS now; no fsync, so the SD card is not forced to sync per payment
+            f.flush()
+        except OSError as e:
+            # A logging failure must not stop the order; drop the handle so the next payment reopens it
+            print(f"Error writing {self._payments_csv_path}: {e}")
+            if self._payments_csv is not None:
+                try:
+                    self._payments_csv.close()
+                except OSError:
+                    pass
+                self._payments_csv = None
+            return
+        print(f"Payment logged to {self._payments_csv_path}")
 
-    def show_thank_you(self):
-        """Display thank you screen."""
-        self.clear_screen()
-        
-        # Create frame in container
-        frame = ttk.Frame(self.container)
+    def _build_dispensing(self):
+        """Build the screen shown while the motor is running."""
+        screen = ttk.Frame(self.container)
+        frame = ttk.Frame(screen)
+        frame.pack(expand=True)
+
+        ttk.Label(
+            frame,
+            text="Dispensing your medicine...",
+            font=self._font(22, bold=True),
+            bootstyle="info"
+        ).pack(pady=20)
+
+        ttk.Label(
+            frame,
+            text="Please wait",
+            font=self._font(16),
+            bootstyle="secondary"
+        ).pack(pady=10)
+        return screen
+
+    def _build_thank_you(self):
+        """Build the thank you screen."""
+        screen = ttk.Frame(self.container)
+        frame = ttk.Frame(screen)
         frame.pack(expand=True)
         
         ttk.Label(
             frame,
             text="Thank you! Please take your medicine.",
-            font=("Arial", 24),
+            font=self._font(24),
             bootstyle="success"
         ).pack(pady=20)
         
@@ -1026,21 +1207,24 @@ class VendingGUI(ttk.Window):
             style="primary.TButton",
             command=self.show_welcome
         ).pack(pady=20)
+        return screen
 
-    def show_error(self, message):
-        """Display error message."""
-        self.clear_screen()
-        
-        # Create frame in container
-        frame = ttk.Frame(self.container)
+    def show_thank_you(self):
+        """Display thank you screen."""
+        self._show("thank_you")
+
+    def _build_error(self):
+        """Build the error screen; the message is filled in by show_error."""
+        screen = ttk.Frame(self.container)
+        frame = ttk.Frame(screen)
         frame.pack(expand=True)
         
-        ttk.Label(
+        self._error_label = ttk.Label(
             frame,
-            text=message,
-            font=("Arial", 20),
+            font=self._font(20),
             bootstyle="danger"
-        ).pack(pady=20)
+        )
+        self._error_label.pack(pady=20)
         
         ttk.Button(
             frame,
@@ -1048,34 +1232,12 @@ class VendingGUI(ttk.Window):
             style="secondary.TButton",
             command=self.show_welcome
         ).pack(pady=20)
+        return screen
 
-    def _toggle_fullscreen_event(self, event=None):
-        """Toggle fullscreen mode via F11 for testing without rebooting the Pi."""
-        self._is_fullscreen = not self._is_fullscreen
-        try:
-            self.attributes("-fullscreen", self._is_fullscreen)
-        except Exception:
-            pass
-        return "break"
-
-    def clear_screen(self):
-        """Clear all widgets from the window."""
-        if not hasattr(self, 'container') or not self.container.winfo_exists():
-            # Recreate container if it doesn't exist
-            self.container = ttk.Frame(self)
-            self.container.pack(fill=BOTH, expand=True)
-            return
-            
-        # Safely destroy all child widgets
-        for widget in self.container.winfo_children():
-            try:
-                if widget.winfo_exists():
-                    widget.destroy()
-            except Exception as e:
-                print(f"Warning: Error destroying widget: {e}")
-        
-        # Force update to ensure widgets are destroyed
-        self.update_idletasks()
+    def show_error(self, message):
+        """Display error message."""
+        self._show("error")
+        self._error_label.configure(text=message)
 
 
 if __name__ == "__main__":
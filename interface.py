@@ -1,18 +1,26 @@
+import csv
 import tkinter as tk
 from tkinter import messagebox
-import pandas as pd
 import os
 
 FILE_PATH = "/home/pi/Desktop/drug_vending_machine_data.csv"
 
 def load_data():
     try:
-        df = pd.read_csv(FILE_PATH)
-        return df
+        with open(FILE_PATH, newline="", encoding="utf-8") as f:
+            return list(csv.DictReader(f))
     except Exception as e:
         messagebox.showerror("File Error", f"Could not load CSV file: {e}")
         return None
 
+def index_by_symptom(rows):
+    """Group rows by symptom once, keeping the order symptoms first appear in the file."""
+    by_symptom = {}
+    for row in rows:
+        if row["Symptom"]:
+            by_symptom.setdefault(row["Symptom"], []).append(row)
+    return by_symptom
+
 def generate_bill_popup(medicine):
     bill_text = (
         f"🧾 Bill Generated:\n\n"
@@ -23,41 +31,42 @@ def generate_bill_popup(medicine):
     )
     messagebox.showinfo("Bill", bill_text)
 
-def select_by_medicine(df):
-    win = tk.Toplevel(root)
-    win.title("Select Medicine")
-    win.geometry("400x400")
+def open_popup(title):
+    """Clear the shared popup window, retitle it and bring it up for new contents."""
+    for child in _popup.winfo_children():
+        child.destroy()
+    _popup.title(title)
+    _popup.deiconify()
+    _popup.lift()
+    return _popup
+
+def select_by_medicine(rows):
+    win = open_popup("Select Medicine")
 
     tk.Label(win, text="Choose Medicine:", font=("Helvetica", 14)).pack(pady=10)
 
-    for _, row in df.iterrows():
+    for row in rows:
         btn = tk.Button(win, text=f"{row['Medicine Name']} (₹{row['Price (₹)']})", 
                         command=lambda r=row: generate_bill_popup(r), 
                         width=30, height=2, bg="#c2f0c2")
         btn.pack(pady=5)
 
-def select_by_symptom(df):
-    win = tk.Toplevel(root)
-    win.title("Select Symptom")
-    win.geometry("400x400")
+def select_by_symptom(by_symptom):
+    win = open_popup("Select Symptom")
 
     tk.Label(win, text="Choose Symptom:", font=("Helvetica", 14)).pack(pady=10)
 
-    symptoms = df["Symptom"].dropna().unique()
-    for symptom in symptoms:
-        btn = tk.Button(win, text=symptom, command=lambda s=symptom: show_medicines_for_symptom(df, s),
+    for symptom in by_symptom:
+        btn = tk.Button(win, text=symptom, command=lambda s=symptom: show_medicines_for_symptom(by_symptom, s),
                         width=30, height=2, bg="#f0e68c")
         btn.pack(pady=5)
 
-def show_medicines_for_symptom(df, symptom):
-    win = tk.Toplevel(root)
-    win.title(f"Medicines for {symptom}")
-    win.geometry("400x400")
+def show_medicines_for_symptom(by_symptom, symptom):
+    win = open_popup(f"Medicines for {symptom}")
 
     tk.Label(win, text=f"Medicines for {symptom}:", font=("Helvetica", 14)).pack(pady=10)
 
-    matching = df[df["Symptom"] == symptom]
-    for _, row in matching.iterrows():
+    for row in by_symptom.get(symptom, []):
         btn = tk.Button(win, text=f"{row['Medicine Name']} (₹{row['Price (₹)']})", 
                         command=lambda r=row: generate_bill_popup(r), 
                         width=30, height=2, bg="#d0e0f0")
@@ -69,18 +78,25 @@ root.title("Smart Drug Vending Machine")
 root.geometry("480x320")
 root.configure(bg="#f5f5f5")
 
-df = load_data()
-if df is None:
+# One popup window is reused for every list; closing it only hides it
+_popup = tk.Toplevel(root)
+_popup.geometry("400x400")
+_popup.withdraw()
+_popup.protocol("WM_DELETE_WINDOW", _popup.withdraw)
+
+rows = load_data()
+if rows is None:
     root.destroy()
+by_symptom = index_by_symptom(rows or [])
 
 tk.Label(root, text="Welcome to the Vending Machine", font=("Helvetica", 16, "bold"), bg="#f5f5f5").pack(pady=20)
 
 btn1 = tk.Button(root, text="🔍 Select by Medicine", font=("Helvetica", 14), width=25, height=2,
-                 command=lambda: select_by_medicine(df), bg="#b3d9ff")
+                 command=lambda: select_by_medicine(rows), bg="#b3d9ff")
 btn1.pack(pady=10)
 
 btn2 = tk.Button(root, text="😷 Select by Symptom", font=("Helvetica", 14), width=25, height=2,
-                 command=lambda: select_by_symptom(df), bg="#ffcccb")
+                 command=lambda: select_by_symptom(by_symptom), bg="#ffcccb")
 btn2.pack(pady=10)
 
 btn3 = tk.Button(root, text="🚪 Exit", font=("Helvetica", 12), width=15, height=1,
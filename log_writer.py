@@ -0,0 +1,83 @@
+import atexit
+import queue
+import threading
+import time
+from config import LOG_FILE
+
+# Lines are grouped into one append of up to BATCH_SIZE lines, at most FLUSH_INTERVAL seconds after the first
+BATCH_SIZE = 32
+FLUSH_INTERVAL = 0.5
+
+_queue = queue.Queue()
+_STOP = object()
+
+
+def _write(lines):
+    with open(LOG_FILE, 'a') as f:
+        f.write(''.join(lines))
+
+
+def _worker():
+    while True:
+        line = _queue.get()
+        if line is _STOP:
+            return
+        if isinstance(line, threading.Event):
+            # flush() marker with nothing queued before it
+            line.set()
+            continue
+        lines = [line]
+        stop = False
+        flushed = None
+        deadline = time.monotonic() + FLUSH_INTERVAL
+        while len(lines) < BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                line = _queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if line is _STOP:
+                stop = True
+                break
+            if isinstance(line, threading.Event):
+                # flush() is waiting: write what we have now
+                flushed = line
+                break
+            lines.append(line)
+        try:
+            _write(lines)
+        except Exception as e:
+            print(f"Error writing transaction log: {e}")
+        if flushed is not None:
+            flushed.set()
+        if stop:
+            return
+
+
+_thread = threading.Thread(target=_worker, name="transaction-log", daemon=True)
+_thread.start()
+
+
+def write_line(line):
+    """Queue one line for the transaction log; returns without touching the file."""
+    _queue.put(line)
+
+
+def flush(timeout=5):
+    """Wait until every line queued so far has been written; the writer keeps running."""
+    if not _thread.is_alive():
+        return
+    done = threading.Event()
+    _queue.put(done)
+    done.wait(timeout)
+
+
+def close():
+    """Write out everything queued so far and stop the writer thread; later lines are not written."""
+    _queue.put(_STOP)
+    _thread.join(timeout=5)
+
+
+atexit.register(close)
@@ -1,85 +1,168 @@
-import RPi.GPIO as GPIO
 import time
-import atexit
-from config import MOTOR_PINS
+import gpio_init
+from config import MOTOR_PINS, FORWARD_PIN, REVERSE_PIN
 
-# Global variable to track if GPIO is initialized
-_gpio_initialized = False
+try:
+    import pigpio  # type: ignore
+except ImportError:  # pigpio is optional; fall back to timing pulses with time.sleep
+    pigpio = None
+
+# How long one dispense runs the motor, in seconds
+DISPENSE_DURATION = 1.0
+
+# Connection to the pigpio daemon, used to time dispense pulses in hardware when it is running
+_pi = None
 
 def _init_gpio():
     """Initialize GPIO pins if not already initialized."""
-    global _gpio_initialized
-    if not _gpio_initialized:
+    if not gpio_init.initialized:
         try:
-            # Set GPIO mode and disable warnings
-            GPIO.setmode(GPIO.BCM)
-            GPIO.setwarnings(False)
-            
-            # Setup motor pins as outputs
-            for slot, pins in MOTOR_PINS.items():
-                GPIO.setup(pins['forward'], GPIO.OUT, initial=GPIO.LOW)
-                GPIO.setup(pins['reverse'], GPIO.OUT, initial=GPIO.LOW)
-            
-            _gpio_initialized = True
+            gpio_init.ensure()
             print("GPIO initialized successfully")
+            _connect_pigpio()
         except Exception as e:
             print(f"Error initializing GPIO: {e}")
-            _gpio_initialized = False
-    return _gpio_initialized
+    return gpio_init.initialized
+
+def _connect_pigpio():
+    """Connect to pigpiod if it is installed and running."""
+    global _pi
+    if pigpio is None or _pi is not None:
+        return
+    pi = pigpio.pi()
+    if pi.connected:
+        _pi = pi
+    else:
+        pi.stop()
+        print("pigpiod not running, timing motor pulses in software")
 
-def dispense(slot_id, direction='forward', duration=1.0):
-    """Dispense medicine from the specified slot."""
+def _pulse(pin, duration):
+    """Drive pin HIGH for duration seconds and back LOW with a pigpio wave, returning when it is over."""
+    # The DMA engine times the pulse, so its length does not depend on Python scheduling
+    _pi.wave_add_generic([
+        pigpio.pulse(1 << pin, 0, int(duration * 1e6)),
+        pigpio.pulse(0, 1 << pin, 0),
+    ])
+    wid = _pi.wave_create()
+    try:
+        _pi.wave_send_once(wid)
+        while _pi.wave_tx_busy():
+            time.sleep(0.01)
+    finally:
+        _pi.wave_delete(wid)
+
+def _motor_pin(slot_id, direction):
+    """Return the BCM pin for a slot and direction, or None (with a message) if there isn't one."""
+    if slot_id not in MOTOR_PINS:
+        print(f"Invalid slot ID: {slot_id}")
+        return None
+    if direction == 'forward':
+        return FORWARD_PIN[slot_id - 1]
+    if direction == 'reverse':
+        return REVERSE_PIN[slot_id - 1]
+    print(f"Invalid direction: {direction}")
+    return None
+
+def start(slot_id, direction='forward'):
+    """Switch a slot's motor on without waiting. Returns True on success; call stop() to end it."""
     if not _init_gpio():
         print("Failed to initialize GPIO")
         return False
-        
-    if slot_id not in MOTOR_PINS:
-        print(f"Invalid slot ID: {slot_id}")
+    pin = _motor_pin(slot_id, direction)
+    if pin is None:
+        return False
+    try:
+        print(f"Starting motor for slot {slot_id} ({direction})...")
+        gpio_init.write(pin, gpio_init.HIGH)
+        return True
+    except Exception as e:
+        print(f"Error starting motor: {e}")
         return False
 
+def stop(slot_id, direction='forward'):
+    """Switch a slot's motor off. Returns True on success.
+
+    If the pin cannot be driven LOW it is retried once, and then every pin is released with
+    gpio_init.cleanup() so the motor is not left running; False is returned in that case.
+    """
+    pin = _motor_pin(slot_id, direction)
+    if pin is None:
+        return False
+    for attempt in range(2):
+        try:
+            gpio_init.write(pin, gpio_init.LOW)
+            print(f"Stopped motor for slot {slot_id}")
+            return True
+        except Exception as e:
+            print(f"Error stopping motor (attempt {attempt + 1}): {e}")
+    # Last resort: release the pins; the next start() sets them up again
     try:
-        pins = MOTOR_PINS[slot_id]
-        pin = pins.get(direction)
-        
-        if pin is None:
-            print(f"Invalid direction: {direction}")
-            return False
-            
-        print(f"Dispensing from slot {slot_id} ({direction}) for {duration} seconds...")
-        
-        # Ensure pin is LOW before starting
-        GPIO.output(pin, GPIO.LOW)
-        time.sleep(0.1)  # Small delay to ensure clean start
-        
-        # Activate motor
-        GPIO.output(pin, GPIO.HIGH)
+        gpio_init.cleanup()
+    except Exception as e:
+        print(f"Error releasing GPIO: {e}")
+    return False
+
+def dispense_many(slot_ids, direction='forward', duration=DISPENSE_DURATION):
+    """Run several slots' motors together for one pulse. Returns True on success."""
+    if not _init_gpio():
+        print("Failed to initialize GPIO")
+        return False
+    pins = [_motor_pin(slot_id, direction) for slot_id in slot_ids]
+    if None in pins:
+        return False
+
+    print(f"Dispensing from slots {list(slot_ids)} ({direction}) for {duration} seconds...")
+    try:
+        # One call switches every pin, so all motors start and stop together
+        gpio_init.write_many(pins, gpio_init.HIGH)
         time.sleep(duration)
-        
-        # Ensure pin is turned off
-        GPIO.output(pin, GPIO.LOW)
-        
-        print(f"Successfully dispensed from slot {slot_id}")
         return True
-        
     except Exception as e:
         print(f"Error during dispensing: {e}")
-        # Try to clean up GPIO on error
-        try:
-            GPIO.cleanup()
-        except:
-            pass
         return False
+    finally:
+        gpio_init.write_many(pins, gpio_init.LOW)
+
+def dispense(slot_id, direction='forward', duration=DISPENSE_DURATION):
+    """Run a slot's motor for one pulse, returning once it has stopped.
+
+    With pigpiod running the pulse is a hardware-timed wave; otherwise start(), sleep, stop().
+
+    Returns True if the pulse ran; a failure to stop is handled (and reported) by stop().
+    """
+    if not _init_gpio():
+        print("Failed to initialize GPIO")
+        return False
+    pin = _motor_pin(slot_id, direction)
+    if pin is None:
+        return False
+
+    if _pi is not None:
+        print(f"Dispensing from slot {slot_id} ({direction}) for {duration} seconds...")
+        try:
+            _pulse(pin, duration)
+        finally:
+            # The wave ends LOW; this only makes sure of it
+            stop(slot_id, direction)
+    else:
+        if not start(slot_id, direction):
+            return False
+        try:
+            time.sleep(duration)
+        finally:
+            stop(slot_id, direction)
+    print(f"Successfully dispensed from slot {slot_id}")
+    return True
 
 def cleanup():
     """Clean up GPIO pins."""
-    global _gpio_initialized
+    global _pi
+    if _pi is not None:
+        _pi.stop()
+        _pi = None
     try:
-        if _gpio_initialized:
-            GPIO.cleanup()
-            _gpio_initialized = False
+        if gpio_init.initialized:
+            gpio_init.cleanup()
             print("GPIO cleaned up successfully")
     except Exception as e:
-        print(f"Error during GPIO cleanup: {e}")
-
-# Register cleanup to be called on program exit
-atexit.register(cleanup)
\ No newline at end of file
+        print(f"Error during GPIO cleanup: {e}")
\ No newline at end of file
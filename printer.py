@@ -1,33 +1,132 @@
-import serial
+import atexit
+import os
+import queue
+import select
+import threading
 from datetime import datetime
 from config import PRINTER_PORT, PRINTER_BAUDRATE
 
-def print_receipt(user_id, user_name, medicine_name, slot_id):
-    """Print receipt using thermal printer."""
+# Checked once at import; the printer device node does not come and go while the kiosk runs
+_USBLP_AVAILABLE = PRINTER_PORT.startswith("/dev/usb/lp") and os.path.exists(PRINTER_PORT)
+
+# ESC/POS commands and the fixed parts of the receipt, encoded once
+_INIT = b'\x1b\x40'  # Initialize printer
+_FEED_LINES = b'\x1b\x64\x04'  # Print and feed n lines (n=4)
+_CUT = b'\x1d\x56\x42\x00'  # Cut paper
+_HEADER = _INIT + b"\nMedicine Vending Machine Receipt\n\n"
+_AMOUNT = "\nAmount: ₹".encode('utf-8')
+_FOOTER = b"\nThank you for your payment!\n\n\n" + _FEED_LINES + _CUT
+
+# Receipts are written in chunks, each once the printer can take more; a printer that takes
+# nothing for WRITE_TIMEOUT seconds fails the receipt
+WRITE_CHUNK = 4096
+WRITE_TIMEOUT = 2.0
+
+# The printer stays open between receipts; a background thread does all the writing
+_queue = queue.Queue()
+_printer = None
+
+
+def _open_printer():
+    """Open the printer: the USB printer device if there is one, else the serial port."""
+    if _USBLP_AVAILABLE:
+        return open(PRINTER_PORT, 'wb', buffering=0)
+    import serial  # Imported here so the GUI still starts on machines without pyserial
+    ser = serial.Serial(PRINTER_PORT, PRINTER_BAUDRATE, timeout=1)
+    # USB-serial adapters hold small writes for up to 16 ms by default; ask the driver to send them at once
     try:
-        ser = serial.Serial(PRINTER_PORT, PRINTER_BAUDRATE, timeout=1)
+        ser.set_low_latency_mode(True)
+    except (AttributeError, ValueError, OSError) as e:
+        print(f"Warning: could not enable low-latency mode on {PRINTER_PORT}: {e}")
+    return ser
+
+
+def _close_printer():
+    global _printer
+    if _printer is not None:
+        try:
+            _printer.close()
+        except Exception:
+            pass
+        _printer = None
+
+
+def _format_receipt(user_id, user_name, medicine_name, slot_id, amount, dt):
+    # Only the field values are encoded per receipt; labels and framing are prebuilt bytes
+    parts = [
+        _HEADER,
+        b"User ID: ", str(user_id).encode('utf-8'),
+        b"\nName: ", str(user_name).encode('utf-8'),
+        b"\nMedicine: ", str(medicine_name).encode('utf-8'),
+        b"\nSlot: ", str(slot_id).encode('utf-8'),
+    ]
+    if amount is not None:
+        parts += (_AMOUNT, f"{amount:.2f}".encode('ascii'))
+    parts += (
+        b"\nDate/Time: ", dt.strftime('%Y-%m-%d %H:%M:%S').encode('ascii'),
+        b"\n",
+        _FOOTER,
+    )
+    return b"".join(parts)
+
+
+def _write(payload):
+    """Send one receipt, reconnecting once if the printer was lost before any of it went out."""
+    global _printer
+    mv = memoryview(payload)
+    for attempt in (1, 2):
+        try:
+            if _printer is None:
+                _printer = _open_printer()
+            fd = _printer.fileno()
+            while mv:
+                _, writable, _ = select.select([], [fd], [], WRITE_TIMEOUT)
+                if not writable:
+                    raise TimeoutError(f"Printer accepted no data for {WRITE_TIMEOUT:.0f}s")
+                try:
+                    mv = mv[os.write(fd, mv[:WRITE_CHUNK]):]
+                except BlockingIOError:
+                    continue
+            return
+        except OSError:  # includes serial.SerialException
+            _close_printer()
+            # Resending a receipt that was partly printed would print it twice
+            if attempt == 2 or len(mv) < len(payload):
+                raise
+
+
+def _worker():
+    while True:
+        job = _queue.get()
+        try:
+            if job is None:
+                return
+            _write(_format_receipt(*job))
+            print("Receipt printed successfully.")
+        except Exception as e:
+            _close_printer()
+            print(f"Printer error: {e}")
+        finally:
+            _queue.task_done()
+
+
+_thread = threading.Thread(target=_worker, name="receipt-printer", daemon=True)
+_thread.start()
+
 
-        # ESC/POS commands for basic formatting
-        init_printer = b'\x1b\x40'  # Initialize printer
-        cut_paper = b'\x1d\x56\x42\x00'  # Cut paper
+def print_receipt(user_id, user_name, medicine_name, slot_id, amount=None):
+    """Queue a receipt for the thermal printer; returns without waiting for the printer.
 
-        receipt_text = f"""
-Medicine Vending Machine Receipt
+    The amount line is printed only when amount is given.
+    """
+    _queue.put((user_id, user_name, medicine_name, slot_id, amount, datetime.now()))
 
-User ID: {user_id}
-Name: {user_name}
-Medicine: {medicine_name}
-Slot: {slot_id}
-Date/Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
-Thank you for using our service!
-"""
+def _shutdown():
+    """Let queued receipts finish printing, then close the port."""
+    _queue.put(None)
+    _thread.join(timeout=5)
+    _close_printer()
 
-        ser.write(init_printer)
-        ser.write(receipt_text.encode('utf-8'))
-        ser.write(cut_paper)
-        ser.close()
 
-        print("Receipt printed successfully.")
-    except Exception as e:
-        print(f"Printer error: {e}")
\ No newline at end of file
+atexit.register(_shutdown)
@@ -1,40 +1,17 @@
 #!/usr/bin/env python3
 
-import time
-import RPi.GPIO as GPIO
-from config import MOTOR_PINS
+import gpio_init
+from motor_control import dispense_many
 
 def setup_gpio():
     """Initialize GPIO settings"""
-    GPIO.setmode(GPIO.BCM)
-    GPIO.setwarnings(False)
-    
-    # Set up all motor pins
-    for slot, pins in MOTOR_PINS.items():
-        GPIO.setup(pins['forward'], GPIO.OUT, initial=GPIO.LOW)
-        GPIO.setup(pins['reverse'], GPIO.OUT, initial=GPIO.LOW)
-    
+    gpio_init.ensure()
     print("GPIO ready!")
 
-def run_motor_forward(slot, duration=5):
-    """Run a motor forward for the specified duration"""
-    # Get the forward pin for this slot
-    pin = MOTOR_PINS[slot]['forward']
-    
-    print(f"Running motor {slot} forward...")
-    try:
-        GPIO.output(pin, GPIO.HIGH)
-        time.sleep(duration)
-        GPIO.output(pin, GPIO.LOW)
-        print(f"Motor {slot} complete!")
-    except Exception as e:
-        print(f"Error running motor {slot}: {e}")
-        GPIO.output(pin, GPIO.LOW)  # Safety: ensure motor is stopped
-
 def main():
     try:
         setup_gpio()
-        print("\nStarting sequential forward test of all motors")
+        print("\nStarting parallel forward test of all motors")
         print("Motor layout (pin numbers):")
         print(" Motor 1: BCM 17 (forward), 18 (reverse)")
         print(" Motor 2: BCM 27 (forward), 22 (reverse)")
@@ -45,23 +22,19 @@ def main():
         print(" Motor 7: BCM 5  (forward), 6  (reverse)")
         print(" Motor 8: BCM 12 (forward), 13 (reverse)")
         print(" Motor 9: BCM 16 (forward), 26 (reverse)")
-        print("\nWill run each motor forward for 5 seconds...")
+        print("\nWill run all motors forward together for 5 seconds...")
         
         input("Press Enter to begin...")
         
-        # Run motors 1 through 9 in sequence
-        for slot in range(1, 10):
-            print(f"\nStarting motor {slot}")
-            run_motor_forward(slot)
-            # Short pause between motors
-            time.sleep(1)
+        # Run motors 1 through 9 at the same time, switched on and off together
+        dispense_many(range(1, 10), duration=5)
             
         print("\nTest complete!")
         
     except KeyboardInterrupt:
         print("\nTest stopped by user")
     finally:
-        GPIO.cleanup()
+        gpio_init.cleanup()
         print("GPIO cleaned up")
 
 if __name__ == "__main__":
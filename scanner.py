@@ -1,10 +1,12 @@
+import atexit
 import serial
+import sys
 import time
-import re
 from typing import Optional
 from config import SCANNER_PORT, SCANNER_BAUDRATE
 
-CONTROL_CHARS_RE = re.compile(r"[\x00-\x1F\x7F]")
+# str.translate table that deletes ASCII control characters (0x00-0x1F and DEL)
+CONTROL_CHARS = dict.fromkeys([*range(0x20), 0x7F])
 
 
 def _open_serial(port: str, baud: int, timeout: float = 1.0) -> serial.Serial:
@@ -12,7 +14,7 @@ def _open_serial(port: str, baud: int, timeout: float = 1.0) -> serial.Serial:
 
     GM812L typically enumerates as /dev/ttyACM0 or /dev/ttyUSB0 and uses 9600-8N1.
     """
-    return serial.Serial(
+    ser = serial.Serial(
         port=port,
         baudrate=baud,
         bytesize=serial.EIGHTBITS,
@@ -21,31 +23,113 @@ def _open_serial(port: str, baud: int, timeout: float = 1.0) -> serial.Serial:
         timeout=timeout,
         write_timeout=1.0,
     )
+    # USB-serial drivers batch incoming bytes on a 16 ms timer by default; deliver each scan as it arrives
+    if sys.platform.startswith("linux"):
+        try:
+            ser.set_low_latency_mode(True)
+        except (AttributeError, ValueError, OSError):
+            # CDC-ACM and other adapters without the ASYNC_LOW_LATENCY flag just keep their defaults
+            pass
+    return ser
+
+
+# The scanner port is opened on first use and kept open between scans
+_ser: Optional[serial.Serial] = None
+
+# Longest wait between attempts to reopen a scanner that has gone away
+MAX_REOPEN_DELAY = 5.0
+
+
+def _get_serial(timeout: Optional[float]) -> serial.Serial:
+    """Return the shared scanner port, opening it if needed, with the given read timeout."""
+    global _ser
+    if _ser is None or not _ser.is_open:
+        _ser = _open_serial(SCANNER_PORT, SCANNER_BAUDRATE, timeout=timeout)
+    elif _ser.timeout != timeout:
+        _ser.timeout = timeout
+    return _ser
+
+
+def close_scanner() -> None:
+    """Close the shared scanner port; the next scan reopens it."""
+    global _ser
+    if _ser is not None:
+        try:
+            _ser.close()
+        except Exception:
+            pass
+        _ser = None
+
+
+def _clean(raw: bytes) -> Optional[str]:
+    """Decode one scanned line and strip control characters; None if nothing is left."""
+    try:
+        text = raw.decode('utf-8', errors='replace')
+    except Exception:
+        text = raw.decode('latin1', errors='replace')
+    text = text.translate(CONTROL_CHARS).strip()
+    return text or None
+
+
+def _read_line(ser: serial.Serial) -> bytes:
+    """Read one scanned line ending in CR or LF; on a read timeout, return whatever arrived."""
+    line = bytearray()
+    while True:
+        c = ser.read(1)
+        if not c:
+            return bytes(line)
+        if c in b"\r\n":
+            # Scanners may end a scan with CR, LF or CRLF; skip the terminator left over from the last scan
+            if line:
+                return bytes(line)
+            continue
+        line += c
 
 
 def scan_barcode_once(timeout: float = 2.0) -> Optional[str]:
-    """Open the scanner, read a single line, clean it, and return the code or None."""
+    """Read a single line from the scanner, clean it, and return the code or None."""
     try:
-        with _open_serial(SCANNER_PORT, SCANNER_BAUDRATE, timeout=timeout) as ser:
-            raw = ser.readline()
-            if not raw:
-                return None
-            try:
-                text = raw.decode('utf-8', errors='replace')
-            except Exception:
-                text = raw.decode('latin1', errors='replace')
-            text = CONTROL_CHARS_RE.sub('', text).strip()
-            return text or None
+        ser = _get_serial(timeout)
+        # Drop anything scanned before this call, so an old scan is never taken for a new one
+        ser.reset_input_buffer()
+        raw = _read_line(ser)
     except Exception as e:
         print(f"Scanner error: {e}")
+        close_scanner()
+        return None
+    if not raw:
         return None
+    return _clean(raw)
 
 
 def wait_for_scan(poll_interval: float = 0.2) -> str:
-    """Block until a non-empty scan is read. Use small sleeps to avoid CPU spin."""
+    """Block until a non-empty scan is read.
+
+    The port stays open between scans, but anything received before this call is discarded.
+    A scan ends at CR or LF, or when no byte arrives for a second. If the scanner fails,
+    the port is reopened after poll_interval seconds, doubling up to MAX_REOPEN_DELAY.
+    """
     print("Please scan your barcode...")
+    delay = poll_interval
+    stale = True
     while True:
-        code = scan_barcode_once(timeout=1.0)
+        try:
+            ser = _get_serial(1.0)
+            if stale:
+                # Drop anything scanned before this wait, so an old scan is never taken for a new one
+                ser.reset_input_buffer()
+                stale = False
+            raw = _read_line(ser)
+        except (serial.SerialException, OSError) as e:
+            print(f"Scanner error: {e}")
+            close_scanner()
+            time.sleep(delay)
+            delay = min(delay * 2, MAX_REOPEN_DELAY)
+            continue
+        delay = poll_interval
+        code = _clean(raw)
         if code:
             return code
-        time.sleep(poll_interval)
\ No newline at end of file
+
+
+atexit.register(close_scanner)
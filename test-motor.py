@@ -1,34 +1,29 @@
-import csv
 import time
-import RPi.GPIO as GPIO
+from pathlib import Path
+import gpio_init
 
 # Motor GPIO Pins
 MOTOR_PIN1 = 17  # Change as per your wiring
 MOTOR_PIN2 = 27  # Change as per your wiring
 
-# Setup GPIO
-GPIO.setmode(GPIO.BCM)
-GPIO.setup(MOTOR_PIN1, GPIO.OUT)
-GPIO.setup(MOTOR_PIN2, GPIO.OUT)
+# Setup GPIO (all motor pins from config.MOTOR_PINS, which include the two above)
+gpio_init.ensure()
 
 # Function to run motor for specified rotations
 def run_motor(rotations, delay=1):
     for _ in range(rotations):
-        GPIO.output(MOTOR_PIN1, GPIO.HIGH)
-        GPIO.output(MOTOR_PIN2, GPIO.LOW)
+        gpio_init.write(MOTOR_PIN1, gpio_init.HIGH)
+        gpio_init.write(MOTOR_PIN2, gpio_init.LOW)
         time.sleep(delay)  # Run motor for delay seconds per rotation
-        GPIO.output(MOTOR_PIN1, GPIO.LOW)
-        GPIO.output(MOTOR_PIN2, GPIO.LOW)
+        gpio_init.write(MOTOR_PIN1, gpio_init.LOW)
+        gpio_init.write(MOTOR_PIN2, gpio_init.LOW)
         time.sleep(0.5)  # Pause between rotations
 
 # Function to read rotations from CSV file
 def get_rotations_from_csv(file_path):
     try:
-        with open(file_path, 'r') as file:
-            reader = csv.reader(file)
-            for row in reader:
-                if row:
-                    return int(row[0])  # Assuming first column has rotation count
+        # The file holds a single value; the first field of the first line is the rotation count
+        return int(Path(file_path).read_text().lstrip().split(",", 1)[0].split("\n", 1)[0].strip())
     except Exception as e:
         print(f"Error reading CSV: {e}")
     return 5  # Default to 5 rotations if error occurs
@@ -44,4 +39,4 @@ print(f"Running motor for {rotations} rotations")
 run_motor(rotations)
 
 # Cleanup GPIO
-GPIO.cleanup()
\ No newline at end of file
+gpio_init.cleanup()
\ No newline at end of file
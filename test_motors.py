@@ -2,66 +2,221 @@
 
 import sys
 import os
-import time
 import json
+import hashlib
+import re
+import mmap
+import asyncio
+import threading
 from pathlib import Path
-import RPi.GPIO as GPIO
-from config import MOTOR_PINS
+
+try:
+    import readline  # noqa: F401  # line editing and history for input() prompts
+except ImportError:
+    pass
+import gpio_init
+from config import MOTOR_PINS, FORWARD_PIN, REVERSE_PIN
+
+try:
+    import orjson  # type: ignore
+
+    def _dumps(data):
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS)
+
+    _loads = orjson.loads
+except ImportError:  # orjson is optional; the stdlib writes the same bytes, just more slowly
+    def _dumps(data):
+        return json.dumps(data, indent=2, sort_keys=True, ensure_ascii=False).encode('utf-8')
+
+    _loads = json.loads
+
+try:
+    import gpiod  # type: ignore
+except ImportError:  # libgpiod bindings are optional; gpio_init covers pin setup without them
+    gpiod = None
 
 DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
 MOTOR_MAP_FILE = os.path.join(DATA_DIR, 'motor_map.json')
 
+# Logical slot numbers, in order
+_MOTOR_KEYS = tuple(sorted(MOTOR_PINS))
+
+# A motor command, already lowercased: "<slot> <f|r|forward|reverse> <seconds>"
+_CMD_RE = re.compile(r'^(\d+)\s+(f|r|forward|reverse)\s+(\d+(?:\.\d*)?|\.\d+)$')
+
+# BCM283x/2711 GPIO registers, as byte offsets into /dev/gpiomem.
+# Writing a bitmask to GPSET0/GPCLR0 drives every pin whose bit is set HIGH/LOW in one store.
+GPIOMEM_DEVICE = '/dev/gpiomem'
+GPSET0 = 0x1C
+GPCLR0 = 0x28
+
+# gpiochip that carries the header pins, for the libgpiod backend
+GPIOD_CHIP = 'gpiochip0'
+
+
+def open_gpiomem():
+    """Map the GPIO register block, or return None where /dev/gpiomem is unavailable (e.g. Pi 5)."""
+    try:
+        fd = os.open(GPIOMEM_DEVICE, os.O_RDWR | os.O_SYNC)
+    except OSError:
+        return None
+    try:
+        return mmap.mmap(fd, 4096, offset=0)
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+
 
 def ensure_data_dir():
     Path(DATA_DIR).mkdir(parents=True, exist_ok=True)
 
 
+# Logical slot -> physical slot, invert flag; built once, callers get a copy
+_DEFAULT_MAPPING = {str(k): {'physical': int(k), 'invert': False} for k in _MOTOR_KEYS}
+
+
 def default_mapping():
-    # Logical slot -> physical slot, invert flag
-    return {str(k): {'physical': int(k), 'invert': False} for k in MOTOR_PINS.keys()}
+    # Entries are replaced, never edited in place, so a shallow copy is enough
+    return dict(_DEFAULT_MAPPING)
+
+
+# Last mapping read from or written to MOTOR_MAP_FILE, with the file's mtime at that point
+# and a hash of its canonical JSON, so saving an unchanged mapping can be skipped
+_MAP_CACHE = {'mtime': None, 'data': None, 'hash': None}
+
+
+def _mapping_json(mapping):
+    """Canonical JSON bytes for a mapping, and their hash."""
+    payload = _dumps(mapping)
+    return payload, hashlib.blake2b(payload, digest_size=16).digest()
 
 
 def load_mapping():
     ensure_data_dir()
-    if os.path.exists(MOTOR_MAP_FILE):
-        try:
-            with open(MOTOR_MAP_FILE, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                # normalize keys as strings
-                return {str(k): v for k, v in data.items()}
-        except Exception as e:
-            print(f"Warning: failed to load motor map: {e}")
-            return default_mapping()
-    else:
+    try:
+        mtime = os.stat(MOTOR_MAP_FILE).st_mtime
+    except OSError:
         return default_mapping()
+    if mtime == _MAP_CACHE['mtime']:
+        return _MAP_CACHE['data']
+    try:
+        with open(MOTOR_MAP_FILE, 'rb') as f:
+            data = _loads(f.read())
+            # normalize keys as strings
+            mapping = {str(k): v for k, v in data.items()}
+    except Exception as e:
+        print(f"Warning: failed to load motor map: {e}")
+        return default_mapping()
+    _MAP_CACHE.update(mtime=mtime, data=mapping, hash=_mapping_json(mapping)[1])
+    return mapping
 
 
 def save_mapping(mapping):
     ensure_data_dir()
+    payload, digest = _mapping_json(mapping)
+    try:
+        on_disk = os.stat(MOTOR_MAP_FILE).st_mtime == _MAP_CACHE['mtime']
+    except OSError:
+        on_disk = False
+    # Skip the write only if the file is still the one the cached hash describes
+    if on_disk and digest == _MAP_CACHE['hash']:
+        _MAP_CACHE['data'] = mapping
+        print(f"Motor mapping unchanged, {MOTOR_MAP_FILE} left as is")
+        return
+    tmp_path = MOTOR_MAP_FILE + '.tmp'
     try:
-        with open(MOTOR_MAP_FILE, 'w', encoding='utf-8') as f:
-            json.dump(mapping, f, indent=2)
+        # Write a complete new file, then swap it in, so a power cut never leaves a half-written map
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, MOTOR_MAP_FILE)
+        _MAP_CACHE.update(mtime=os.stat(MOTOR_MAP_FILE).st_mtime, data=mapping, hash=digest)
         print(f"Motor mapping saved to {MOTOR_MAP_FILE}")
     except Exception as e:
+        _MAP_CACHE.update(mtime=None, data=None, hash=None)
         print(f"Failed to save motor map: {e}")
 
 
+def ask_int(prompt, lo, hi):
+    """Prompt until the answer is a whole number in lo..hi."""
+    while True:
+        resp = input(prompt).strip()
+        if resp.isdigit() and lo <= int(resp) <= hi:
+            return int(resp)
+        print(f"Please enter a number from {lo} to {hi}.")
+
+
+def ask_yn(prompt):
+    """Prompt until the answer is y or n; True for y."""
+    while True:
+        resp = input(prompt).strip().lower()
+        if resp in ('y', 'n'):
+            return resp == 'y'
+        print("Enter 'y' or 'n'.")
+
+
 class MotorTester:
     def __init__(self, mapping=None):
         self.mapping = mapping or load_mapping()
+        self.build_pin_table()
         self.setup_gpio()
 
+        # Pin directions are set up by setup_gpio; levels are written straight to the registers when possible
+        self._gpiomem = open_gpiomem()
+        # 32-bit view so each register write is a single word store, as the peripheral requires
+        self._regs = memoryview(self._gpiomem).cast('I') if self._gpiomem is not None else None
+
+        # Motors are switched off by deadlines on this loop, so starting one never blocks the caller
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, name='motor-scheduler', daemon=True).start()
+
     def setup_gpio(self):
         """Initialize GPIO settings"""
-        GPIO.setmode(GPIO.BCM)
-        GPIO.setwarnings(False)
+        self._bulk = None
+        # libgpiod v1 bindings: request every motor line at once, so one ioctl sets them all
+        if gpiod is not None and hasattr(gpiod, 'LINE_REQ_DIR_OUT'):
+            try:
+                pins = FORWARD_PIN + REVERSE_PIN
+                bulk = gpiod.Chip(GPIOD_CHIP).get_lines(list(pins))
+                bulk.request(consumer='vending', type=gpiod.LINE_REQ_DIR_OUT, default_vals=[0] * len(pins))
+            except OSError as e:
+                print(f"gpiod unavailable ({e}), using gpio_init")
+            else:
+                self._bulk = bulk
+                self._bulk_lock = threading.Lock()
+                self._levels = [0] * len(pins)
+                self.pin_index = {pin: i for i, pin in enumerate(pins)}
+                print("GPIO ready!")
+                return
+        gpio_init.ensure()
+        print("GPIO ready!")
 
-        # Set up all motor pins
-        for slot, pins in MOTOR_PINS.items():
-            GPIO.setup(pins['forward'], GPIO.OUT, initial=GPIO.LOW)
-            GPIO.setup(pins['reverse'], GPIO.OUT, initial=GPIO.LOW)
+    def _drive(self, mask, level):
+        """Set the pins in mask to level when the registers are not mapped."""
+        pins = [pin for pin in range(32) if mask >> pin & 1]
+        if self._bulk is not None:
+            with self._bulk_lock:
+                for pin in pins:
+                    self._levels[self.pin_index[pin]] = level
+                self._bulk.set_values(self._levels)
+        else:
+            gpio_init.write_many(pins, level)
 
-        print("GPIO ready!")
+    def set_pins(self, mask):
+        """Drive HIGH every BCM pin whose bit is set in mask."""
+        if self._regs is not None:
+            self._regs[GPSET0 // 4] = mask
+        else:
+            self._drive(mask, 1)
+
+    def clear_pins(self, mask):
+        """Drive LOW every BCM pin whose bit is set in mask."""
+        if self._regs is not None:
+            self._regs[GPCLR0 // 4] = mask
+        else:
+            self._drive(mask, 0)
 
     def logical_to_physical(self, logical_slot):
         key = str(logical_slot)
@@ -71,36 +226,85 @@ class MotorTester:
             return int(logical_slot), False
         return int(m.get('physical', logical_slot)), bool(m.get('invert', False))
 
+    def build_pin_table(self):
+        """Resolve every (logical slot, 'f'|'r') to its BCM pin once, applying the mapping and inversion."""
+        self.valid_logical = frozenset(_MOTOR_KEYS)
+        self.pin_table = {}
+        for logical in self.valid_logical:
+            physical_slot, invert = self.logical_to_physical(logical)
+            if physical_slot not in MOTOR_PINS:
+                print(f"Mapped physical slot {physical_slot} not in MOTOR_PINS (logical {logical})")
+                continue
+            forward = FORWARD_PIN[physical_slot - 1]
+            reverse = REVERSE_PIN[physical_slot - 1]
+            self.pin_table[(logical, 'f')] = reverse if invert else forward
+            self.pin_table[(logical, 'r')] = forward if invert else reverse
+
+    def resolve_pin(self, logical_slot, direction):
+        """BCM pin for a logical slot and direction ('f'/'r' or words starting with f/r), or None."""
+        try:
+            logical = int(logical_slot)
+        except (TypeError, ValueError):
+            logical = None
+        if logical not in self.valid_logical:
+            print(f"Error: Invalid logical motor {logical_slot}. Valid: {_MOTOR_KEYS}")
+            return None
+
+        d = 'f' if str(direction).lower().startswith('f') else 'r'
+        pin = self.pin_table.get((logical, d))
+        if pin is None:
+            print(f"Logical motor {logical} has no valid physical mapping")
+        return pin
+
+    async def _clear_after(self, mask, duration):
+        await asyncio.sleep(duration)
+        self.clear_pins(mask)
+        return True
+
+    def test_motor_async(self, logical_slot, direction, duration):
+        """Start a logical motor and return at once; the scheduler switches it off after duration seconds.
+
+        Returns a concurrent.futures.Future that resolves when the motor stops, or None if it did not start.
+        """
+        pin = self.resolve_pin(logical_slot, direction)
+        if pin is None:
+            return None
+        print(f"Logical {logical_slot} {direction} -> pin {pin} for {duration}s")
+        mask = 1 << pin
+        self.set_pins(mask)
+        return asyncio.run_coroutine_threadsafe(self._clear_after(mask, duration), self._loop)
+
+    def dispense_many(self, items):
+        """Start several logical motors with one register write; items are (logical_slot, direction, duration).
+
+        Motors sharing a duration are switched off together by one write. Returns a
+        concurrent.futures.Future per distinct duration, or None if any item is invalid.
+        """
+        set_mask = 0
+        masks = {}
+        for logical_slot, direction, duration in items:
+            pin = self.resolve_pin(logical_slot, direction)
+            if pin is None:
+                return None
+            set_mask |= 1 << pin
+            masks[duration] = masks.get(duration, 0) | 1 << pin
+
+        self.set_pins(set_mask)
+        return [
+            asyncio.run_coroutine_threadsafe(self._clear_after(mask, duration), self._loop)
+            for duration, mask in masks.items()
+        ]
+
     def test_motor(self, logical_slot, direction, duration):
         """Test a specific logical motor. Mapping is applied so logical slots map to physical ones.
 
         direction: 'f' or 'r' (or words starting with f/r)
         """
-        if str(logical_slot) not in [str(k) for k in MOTOR_PINS.keys()]:
-            print(f"Error: Invalid logical motor {logical_slot}. Valid: {list(MOTOR_PINS.keys())}")
-            return False
-
-        physical_slot, invert = self.logical_to_physical(logical_slot)
-
-        # Determine intended direction
-        dir_full = 'forward' if str(direction).lower().startswith('f') else 'reverse'
-
-        # Apply inversion if mapping says so
-        if invert:
-            dir_full = 'reverse' if dir_full == 'forward' else 'forward'
-
-        if physical_slot not in MOTOR_PINS:
-            print(f"Mapped physical slot {physical_slot} not in MOTOR_PINS")
-            return False
-
-        pin = MOTOR_PINS[physical_slot][dir_full]
-
-        print(f"Logical {logical_slot} -> Physical {physical_slot}, invert={invert}. Running {dir_full} (pin {pin}) for {duration}s")
-
         try:
-            GPIO.output(pin, GPIO.HIGH)
-            time.sleep(duration)
-            GPIO.output(pin, GPIO.LOW)
+            done = self.test_motor_async(logical_slot, direction, duration)
+            if done is None:
+                return False
+            done.result()
             print("Done!")
             return True
         except Exception as e:
@@ -109,8 +313,19 @@ class MotorTester:
 
     def cleanup(self):
         """Clean up GPIO settings"""
+        # Stop the scheduler and switch off anything it was still due to stop
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self.clear_pins(sum(1 << pin for pin in FORWARD_PIN + REVERSE_PIN))
+        if self._gpiomem is not None:
+            self._regs.release()
+            self._gpiomem.close()
+            self._regs = self._gpiomem = None
         try:
-            GPIO.cleanup()
+            if self._bulk is not None:
+                self._bulk.release()
+                self._bulk = None
+            else:
+                gpio_init.cleanup()
             print("GPIO cleaned up successfully")
         except Exception as e:
             print(f"Error during cleanup: {e}")
@@ -126,7 +341,7 @@ class MotorTester:
         """
         print("Starting interactive calibration. Make sure you have a clear view of motors.")
         mapping = {}
-        for logical in sorted(MOTOR_PINS.keys()):
+        for logical in _MOTOR_KEYS:
             print('\n' + '-' * 40)
             print(f"Logical slot: {logical}")
             input("Press Enter to run logical forward for 10s (will activate mapped physical motor)...")
@@ -136,13 +351,7 @@ class MotorTester:
             self.test_motor(logical, 'f', 10.0)
 
             # Ask user which physical motor moved
-            while True:
-                resp = input(f"Which PHYSICAL slot moved for logical {logical}? (enter number, or 0 if none) ").strip()
-                if resp.isdigit():
-                    phys = int(resp)
-                    break
-                else:
-                    print("Please enter a number (e.g., 1..9) or 0 if you couldn't identify it.")
+            phys = ask_int(f"Which PHYSICAL slot moved for logical {logical}? (enter number, or 0 if none) ", 0, _MOTOR_KEYS[-1])
 
             if phys == 0:
                 # User couldn't identify: fallback to identity mapping
@@ -151,13 +360,7 @@ class MotorTester:
                 continue
 
             # Ask whether the observed movement corresponded to forward command
-            while True:
-                fwd = input("Did the motor move FORWARD when you commanded logical FORWARD? (y/n) ").strip().lower()
-                if fwd in ('y', 'n'):
-                    invert = (fwd == 'n')
-                    break
-                else:
-                    print("Enter 'y' or 'n'.")
+            invert = not ask_yn("Did the motor move FORWARD when you commanded logical FORWARD? (y/n) ")
 
             mapping[str(logical)] = {'physical': phys, 'invert': invert}
             print(f"Saved: logical {logical} -> physical {phys}, invert={invert}")
@@ -166,6 +369,7 @@ class MotorTester:
         save_mapping(mapping)
         # Update current mapping in-memory
         self.mapping = mapping
+        self.build_pin_table()
         print("Calibration complete.")
 
 
@@ -179,7 +383,7 @@ def show_help():
     print("  c    - run calibration wizard")
     print("  h    - help")
     print("  q    - quit")
-    print("\nAvailable logical motors:", list(MOTOR_PINS.keys()))
+    print("\nAvailable logical motors:", _MOTOR_KEYS)
 
 
 def main():
@@ -210,33 +414,20 @@ def main():
                     if cmd in ('c', 'calibrate'):
                         tester.calibrate_interactive(); continue
 
-                    parts = cmd.split()
-                    if len(parts) != 3:
-                        print("Please use format: 1 f 10")
-                        continue
-                    motor = int(parts[0])
-                    direction = parts[1]
-                    seconds = float(parts[2])
-                    if direction not in ['f', 'r', 'forward', 'reverse']:
-                        print("Direction must be 'f' or 'r'")
+                    m = _CMD_RE.match(cmd)
+                    if not m:
+                        print("Invalid input. Use format: 1 f 10 (direction 'f' or 'r')")
                         continue
-                    tester.test_motor(motor, direction, seconds)
-                except ValueError:
-                    print("Invalid input. Use format: 1 f 10")
+                    tester.test_motor(int(m.group(1)), m.group(2), float(m.group(3)))
                 except KeyboardInterrupt:
                     break
 
         elif len(args) == 3:
-            try:
-                motor = int(args[0])
-                direction = args[1].lower()
-                seconds = float(args[2])
-                if direction not in ['f', 'r', 'forward', 'reverse']:
-                    print("Direction must be 'f' or 'r'")
-                    return
-                tester.test_motor(motor, direction, seconds)
-            except ValueError:
-                print("Invalid input. Use format: python test_motors.py 1 f 10")
+            m = _CMD_RE.match(' '.join(args).lower())
+            if not m:
+                print("Invalid input. Use format: python test_motors.py 1 f 10 (direction 'f' or 'r')")
+                return
+            tester.test_motor(int(m.group(1)), m.group(2), float(m.group(3)))
         else:
             show_help()
     except KeyboardInterrupt:
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Payment QR Pre-render Tool
+
+Usage:
+  python tools/prepare_qr.py [--src assets/images/qr.jpeg] [--dst assets/images/qr_display.png] [--size 400]
+
+What it does:
+- Loads the static payment QR image
+- Resizes it once to the size shown on the payment screen (LANCZOS)
+- Saves it as a PNG that Tk can load directly, without Pillow
+
+Run it again whenever the source QR image changes, then restart the GUI.
+"""
+
+import argparse
+import os
+import sys
+
+try:
+    from PIL import Image  # type: ignore
+except Exception:
+    print("Pillow is not installed. Install with: pip install Pillow")
+    sys.exit(1)
+
+IMAGES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'assets', 'images')
+
+
+def prepare_qr(src: str, dst: str, size: int) -> None:
+    with Image.open(src) as img:
+        img = img.convert("RGB").resize((size, size), Image.Resampling.LANCZOS)
+        img.save(dst, format="PNG", optimize=True)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--src', default=os.path.join(IMAGES_DIR, 'qr.jpeg'), help='Source QR image')
+    ap.add_argument('--dst', default=os.path.join(IMAGES_DIR, 'qr_display.png'), help='Pre-rendered PNG to write')
+    ap.add_argument('--size', type=int, default=400, help='Edge length in pixels, as shown on the payment screen')
+    args = ap.parse_args()
+
+    try:
+        prepare_qr(args.src, args.dst, args.size)
+    except Exception as e:
+        print(f"[ERROR] Could not prepare QR image: {e}")
+        sys.exit(1)
+    print(f"[INFO] Wrote {args.size}x{args.size} QR image to {args.dst}")
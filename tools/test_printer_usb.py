@@ -17,6 +17,8 @@ Make sure:
 """
 
 import argparse
+import os
+import select
 import sys
 import time
 
@@ -26,6 +28,27 @@ except Exception:
     print("pyserial is not installed. Install with: pip install pyserial")
     sys.exit(1)
 
+# ESC/POS commands
+INIT = b"\x1b\x40"  # Initialize
+BOLD_ON = b"\x1b\x45\x01"
+BOLD_OFF = b"\x1b\x45\x00"
+ALIGN_CENTER = b"\x1b\x61\x01"
+ALIGN_LEFT = b"\x1b\x61\x00"
+FEED_4 = b"\x1b\x64\x04"  # feed 4 lines
+CUT_FULL = b"\x1d\x56\x42\x00"
+
+# Fixed text of the test page, encoded once
+TITLE = "Thermal Printer Test\n".encode("utf-8")
+SUBTITLE = "ESC/POS Sample\n".encode("utf-8")
+UTF8_HEADING = "\nUTF-8 Characters test:\n".encode("utf-8")
+RUPEE_LINE = "- Rupee: \u20b9\n".encode("utf-8")  # may not render if font unsupported
+DEGREE_LINE = "- Degree: \u00b0C\n".encode("utf-8")
+
+# Writes go straight to the port's descriptor in chunks, each waiting until the port can take more.
+# Give up if the printer accepts nothing for WRITE_STALL_TIMEOUT seconds.
+WRITE_CHUNK = 4096
+WRITE_STALL_TIMEOUT = 2.0
+
 
 def open_printer(path: str, baud: int) -> serial.Serial:
     try:
@@ -36,7 +59,6 @@ def open_printer(path: str, baud: int) -> serial.Serial:
             parity=serial.PARITY_NONE,
             stopbits=serial.STOPBITS_ONE,
             timeout=1,
-            write_timeout=2,
         )
         return ser
     except serial.SerialException as e:
@@ -45,36 +67,43 @@ def open_printer(path: str, baud: int) -> serial.Serial:
         raise
 
 
+def write_payload(ser: serial.Serial, payload: bytes) -> None:
+    fd = ser.fileno()
+    mv = memoryview(payload)
+    while mv:
+        _, writable, _ = select.select([], [fd], [], WRITE_STALL_TIMEOUT)
+        if not writable:
+            raise serial.SerialTimeoutException(f"Printer accepted no data for {WRITE_STALL_TIMEOUT:.0f}s")
+        n = os.write(fd, mv[:WRITE_CHUNK])
+        mv = mv[n:]
+
+
 def escpos_test(ser: serial.Serial):
-    init = b"\x1b\x40"  # Initialize
-    bold_on = b"\x1b\x45\x01"
-    bold_off = b"\x1b\x45\x00"
-    align_center = b"\x1b\x61\x01"
-    align_left = b"\x1b\x61\x00"
-    feed_4 = b"\x1b\x64\x04"  # feed 4 lines
-    cut_full = b"\x1d\x56\x42\x00"
-
-    ser.write(init)
-    ser.write(align_center)
-    ser.write(bold_on)
-    ser.write("Thermal Printer Test\n".encode("utf-8"))
-    ser.write(bold_off)
-    ser.write("ESC/POS Sample\n".encode("utf-8"))
-    ser.write(align_left)
+    payload = bytearray()
+    payload += INIT
+    payload += ALIGN_CENTER
+    payload += BOLD_ON
+    payload += TITLE
+    payload += BOLD_OFF
+    payload += SUBTITLE
+    payload += ALIGN_LEFT
 
     # Check character sets
-    ser.write("\nUTF-8 Characters test:\n".encode("utf-8"))
-    ser.write("- Rupee: \xe2\x82\xb9\n".encode("utf-8"))  # may not render if font unsupported
-    ser.write("- Degree: \xc2\xb0C\n".encode("utf-8"))
+    payload += UTF8_HEADING
+    payload += RUPEE_LINE
+    payload += DEGREE_LINE
 
     # Print timestamp
     ts = time.strftime("%Y-%m-%d %H:%M:%S")
-    ser.write(f"\nPrinted at: {ts}\n".encode("utf-8"))
+    payload += f"\nPrinted at: {ts}\n".encode("utf-8")
+
+    payload += FEED_4
 
-    ser.write(feed_4)
+    # Send the whole test page in one write, then cut once it has been printed
+    write_payload(ser, payload)
     ser.flush()
     time.sleep(0.3)
-    ser.write(cut_full)
+    write_payload(ser, CUT_FULL)
     ser.flush()
 
 
@@ -6,7 +6,7 @@ Usage:
   python tools/test_scanner_gm812l.py [--port /dev/ttyACM0] [--baud 9600]
 
 Features:
-- Opens the serial port and continuously reads lines
+- Opens the serial port and reads whatever has arrived straight from its file descriptor, splitting it into lines
 - Prints raw bytes and UTF-8 decoded text
 - Shows timing and length of frames
 - Handles common errors and provides remediation hints
@@ -19,6 +19,11 @@ Notes:
 """
 
 import argparse
+import atexit
+import logging
+import logging.handlers
+import os
+import select
 import sys
 import time
 from typing import Optional
@@ -29,6 +34,21 @@ except Exception as e:  # pragma: no cover
     print("pyserial is not installed. Install with: pip install pyserial", file=sys.stderr)
     sys.exit(1)
 
+# Frame lines are buffered and written to stdout in batches, so a burst of scans never waits on the terminal
+logger = logging.getLogger('gm812l')
+logger.setLevel(logging.INFO)
+logger.propagate = False
+_stdout_handler = logging.StreamHandler(sys.stdout)
+_stdout_handler.setFormatter(logging.Formatter('%(message)s'))
+_frame_buffer = logging.handlers.MemoryHandler(64, flushLevel=logging.ERROR, target=_stdout_handler)
+logger.addHandler(_frame_buffer)
+atexit.register(_frame_buffer.flush)
+
+# Buffered frame lines are written out at least this often (seconds)
+FLUSH_INTERVAL = 0.1
+# A frame with no CR/LF is shown once the line has been quiet this long (seconds)
+FRAME_TIMEOUT = 1.0
+
 
 def open_port(path: str, baud: int) -> serial.Serial:
     try:
@@ -41,26 +61,78 @@ def open_port(path: str, baud: int) -> serial.Serial:
 
 
 def decode_bytes(data: bytes) -> str:
-    try:
-        return data.decode('utf-8', errors='replace').strip()
-    except Exception:
-        return data.hex(' ')
+    s = data.strip()
+    # Barcodes are nearly always plain ASCII, which decodes without UTF-8 validation
+    if s.isascii():
+        return s.decode('ascii')
+    return s.decode('utf-8', errors='replace')
+
+
+def _frame_end(buf: bytearray) -> int:
+    """Length of the first complete frame in buf, terminator included, or -1 if there is none yet."""
+    cr = buf.find(b'\r')
+    lf = buf.find(b'\n')
+    if cr == -1 and lf == -1:
+        return -1
+    if cr == -1 or (lf != -1 and lf < cr):
+        return lf + 1
+    if cr + 1 < len(buf):
+        return cr + 2 if buf[cr + 1] == 0x0A else cr + 1
+    # A trailing CR might be followed by LF in the next chunk; wait for it (or for the line to go quiet)
+    return -1
 
 
 def run(path: str, baud: int) -> None:
     print(f"[INFO] Opening {path} @ {baud} baud...")
     ser = open_port(path, baud)
     print("[INFO] Port opened. Waiting for scans... Press Ctrl+C to exit.")
+    # Read the tty descriptor directly: one select + os.read per burst instead of going through pyserial
+    fd = ser.fileno()
+    buf = bytearray()
+    t0 = time.monotonic()
+
+    def log_frame(frame: bytes) -> None:
+        dt = time.monotonic() - t0
+        decoded = decode_bytes(frame)
+        logger.info("[FRAME] %d bytes in %.1f ms | raw=%r | text='%s'", len(frame), dt * 1000, frame, decoded)
+
+    last_data = last_flush = time.monotonic()
     try:
         while True:
-            t0 = time.monotonic()
-            line = ser.readline()  # reads until \n or timeout
-            dt = time.monotonic() - t0
-            if not line:
+            readable, _, _ = select.select([fd], [], [], FLUSH_INTERVAL)
+            now = time.monotonic()
+            if now - last_flush >= FLUSH_INTERVAL:
+                _frame_buffer.flush()
+                last_flush = now
+            if not readable:
+                # The line went quiet: show a frame that never got its terminator
+                if buf and now - last_data >= FRAME_TIMEOUT:
+                    log_frame(bytes(buf))
+                    buf.clear()
                 continue
-            decoded = decode_bytes(line)
-            print(f"[FRAME] {len(line)} bytes in {dt*1000:.1f} ms | raw={line!r} | text='{decoded}'")
+            last_data = now
+            try:
+                data = os.read(fd, 4096)
+            except OSError as e:
+                data = b''
+                print(f"[ERROR] Read failed: {e}")
+            if not data:
+                # Readable but empty (or failing) means the device went away
+                _frame_buffer.flush()
+                print("[ERROR] Scanner disconnected. Replug it and run again.")
+                break
+            if not buf:
+                t0 = time.monotonic()  # frame timing starts at its first chunk
+            buf += data
+            # A frame ends at CR or LF; a CRLF pair stays together in one frame
+            end = _frame_end(buf)
+            while end != -1:
+                log_frame(bytes(buf[:end]))
+                del buf[:end]
+                t0 = time.monotonic()
+                end = _frame_end(buf)
     except KeyboardInterrupt:
+        _frame_buffer.flush()
         print("\n[INFO] Exiting on user request")
     finally:
         try: